@@ -1,26 +1,66 @@
 import random
-from collections import deque
 
 from Modification.pcb_m import PCBManager, PCB
 from buffer import log
-from buffer import VIRTUAL_PAGES, PAGE_SIZE, MEMORY_BLOCKS, USABLE_BLOCKS
+from replacement import make_policy
+from frame_allocator import FrameAllocator
+from buddy import BuddyAllocator
+from frame_table import FrameTable
+from shared_segment import SharedSegment
+from belady import simulate_opt
+from miss_ratio import miss_ratio_curve
+from buffer import DEFAULT_CONFIG, MachineConfig
 
 """内存管理器类"""
 
 
 class MemoryManager:
 
-    def __init__(self):
+    def __init__(self, policy="lru", tlb=None, prefetcher=None, writeback=None, swap=None, allocation="paged",
+                 config: MachineConfig = None):
+        """
+        :param policy: 页面置换策略名（lru、second_chance、clock、eclock、lfu、2q、arc）或 ReplacementPolicy 实例
+        :param tlb: TLB 实例，为 None 时不模拟快表
+        :param prefetcher: Prefetcher 实例，为 None 时不预取
+        :param writeback: WriteBackQueue 实例，为 None 时脏页只记录日志、不写回
+        :param swap: SwapArea 实例，给出时页面带有真实内容，换入换出在交换区与主存帧之间复制；
+                     与 writeback 同时使用时，writeback 必须以该交换区为后端
+        :param allocation: "paged" 为按页分配单个块；"contiguous" 为用伙伴系统给每个进程分配连续块
+        :param config: 机器配置，为 None 时使用 DEFAULT_CONFIG
+        """
+        self.config = config = config if config is not None else DEFAULT_CONFIG
+        memory_blocks, usable_blocks = config.memory_blocks, config.usable_blocks
+        self.page_size = config.page_size
 
-        # 初始化内存，先填充所有块为空
-        self.memory = [{"pcb": None, "page": -1}] * MEMORY_BLOCKS
-        # 将内存的最后 (MEMORY_BLOCKS - USABLE_BLOCKS) 个块设为空闲，前面的块设为已满
-        self.memory = [1] * (MEMORY_BLOCKS - USABLE_BLOCKS) + [
-            {"pcb": None, "page": -1}] * USABLE_BLOCKS
+        # 主存块表：最后 usable_blocks 个块为空，前面的块为保留块
+        self.memory = FrameTable(memory_blocks, reserved=range(0, memory_blocks - usable_blocks))
 
-        # 初始化 bitmap，前面 USABLE_BLOCKS 个块为空闲 (标记为 0)，其余的块已满 (标记为 1)
-        self.bitmap = [1] * (MEMORY_BLOCKS - USABLE_BLOCKS) + [0] * USABLE_BLOCKS
-        self.memory_stack = deque()
+        # 初始化 bitmap，最后 usable_blocks 个块为空闲 (标记为 0)，其余的块已满 (标记为 1)
+        self.bitmap = bytearray(b"\x01") * (memory_blocks - usable_blocks) + bytearray(usable_blocks)  # 每块 1 字节
+        self.memory_stack = make_policy(policy, usable_blocks)  # 主存栈（页面置换策略），键为 (pcb, page)
+        if allocation not in ("paged", "contiguous"):
+            raise ValueError(f"未知的分配方式: {allocation}")
+        # 按页分配时由空闲块链表管理可用块；连续分配时由伙伴系统管理，PCB.begin 为进程的起始块号
+        self.free_frames = FrameAllocator(self.bitmap, memory_blocks - usable_blocks, memory_blocks) if allocation == "paged" else None
+        self.buddy = BuddyAllocator(self.bitmap, memory_blocks - usable_blocks, memory_blocks) if allocation == "contiguous" else None
+        self.resident_frames = {}  # 每个进程驻留的主存块及其页号 {pcb: {block: page}}
+        # 被多个进程映射的主存块 {block: {(pcb, page), ...}}，集合大小即引用计数；
+        # 主存块表与置换策略中只记录其中一个映射（所有者）
+        self.shared_frames = {}
+        self.segment_maps = {}  # 进程映射的共享段 {pcb: [(起始页号, 段), ...]}
+        self.stats = {"requests": 0, "hits": 0, "faults": 0, "evictions": 0, "cow_copies": 0}  # 页面访问统计
+        self.tlb = tlb  # 快表，位于页表查询之前
+        self.prefetcher = prefetcher  # 缺页时的顺序/跨步预取
+        self.writeback = writeback  # 脏页写回队列
+        if swap is not None and writeback is not None and writeback.store is not swap:
+            raise ValueError("同时使用交换区和写回队列时，写回队列必须以该交换区为后端")
+        for store in (swap, writeback.store if writeback is not None else None):
+            if store is not None and store.page_size != self.page_size:
+                raise ValueError(f"交换区页面大小 {store.page_size} 与配置的页面大小 {self.page_size} 不一致")
+        self.swap = swap  # 交换区
+        # 主存帧内容，仅在使用交换区时分配
+        self.physical_memory = memoryview(bytearray(memory_blocks * self.page_size)) if swap is not None else None
+        self.reference_trace = []  # 页面访问串 [(进程名, 页号), ...]，供 OPT 等离线分析使用
 
     def request_pages_for_process(self, pcb):
         """根据 PCB 请求分配的页面"""
@@ -37,102 +77,449 @@ class MemoryManager:
         # 请求选中的页面
         self.request_page(selected_page, pcb)
 
-    def deal_with_write(self, pcb: PCB, number):
+    def _frame_view(self, block_index):
+        """主存块内容的 memoryview 切片"""
+        return self.physical_memory[block_index * self.page_size:(block_index + 1) * self.page_size]
+
+    def deal_with_read(self, pcb: PCB, number, address):
+        """READ 指令：使用交换区时读出地址处的字节"""
+        mapping = self._segment_page(pcb, number)
+        if mapping is not None:
+            pcb, number = mapping
+        if not self._resident(pcb, number):
+            log.append(f"进程{pcb.process_name}的{number}号页不在主存中，跳过READ")
+            return None
+        frame = pcb.page_table[number]["frame"]
+        if self.physical_memory is None:
+            return None
+        value = self.physical_memory[frame * self.page_size + address % self.page_size]
+        log.append(f"进程{pcb.process_name}读取地址{address}的内容为{value}")
+        return value
+
+    def deal_with_write(self, pcb: PCB, number, address=None):
+        mapping = self._segment_page(pcb, number)
+        if mapping is not None:
+            pcb, number = mapping  # 共享段可写，修改位记在段的页表项上
+        if not self._resident(pcb, number):
+            log.append(f"进程{pcb.process_name}的{number}号页不在主存中，跳过WRITE")
+            return
+        frame = pcb.page_table[number]["frame"]
+        if frame in self.shared_frames and mapping is None:
+            frame = self._copy_on_write(pcb, number, frame)
         pcb.page_table[number]["modification"] = 1
+        self.memory.dirty[frame] = 1
+        if self.physical_memory is not None and address is not None:
+            # 写入地址的低 8 位，便于换入后核对内容
+            self.physical_memory[frame * self.page_size + address % self.page_size] = address & 0xFF
         log.append(" ")
         log.append(f"执行WRITE进程，进程{pcb.process_name}的{number}号页修改位置1")
         log.append(" ")
 
+    def fork(self, parent: PCB, child: PCB):
+        """写时复制 fork：子进程映射父进程驻留的全部主存块，块的引用计数加一
+
+        共享块只读，任一进程写入时由 deal_with_write 复制出私有块。
+        父进程已换出的页面随交换区一起复制。只支持按页分配。
+        """
+        if self.buddy is not None:
+            raise ValueError("连续分配方式不支持写时复制 fork")
+        if self.writeback is not None:
+            self.writeback.flush()  # 待写回的脏页先落到交换区，再随交换区复制给子进程
+        if self.swap is not None:
+            self.swap.fork(parent.process_name, child.process_name)
+        for start, segment in self.segment_maps.get(parent, ()):
+            self.segment_maps.setdefault(child, []).append((start, segment))
+            segment.attached[child] = start
+        child_frames = self.resident_frames.setdefault(child, {})
+        for entry in list(parent.page_table):
+            if entry["exist"] != 1:
+                continue
+            block_index, page_index = entry["frame"], entry["page"]
+            child_entry = child.page_table[page_index]
+            child_entry["exist"] = 1
+            child_entry["frame"] = block_index
+            child_entry["modification"] = entry["modification"]
+            self.shared_frames.setdefault(block_index, {(parent, page_index)}).add((child, page_index))
+            child_frames[block_index] = page_index
+        log.append(f"进程 {child.process_name} 由 {parent.process_name} fork，共享 {len(child_frames)} 个主存块")
+
+    def attach(self, pcb, segment: SharedSegment, start: int):
+        """把共享段映射到进程页号 [start, start + 段页数)，段页面在进程第一次访问时映射"""
+        if self.buddy is not None:
+            raise ValueError("连续分配方式不支持共享段")
+        if pcb in segment.attached:
+            raise ValueError(f"进程 {pcb.process_name} 已映射共享段 {segment.name}")
+        end = start + segment.page_count
+        if start < 0 or end > pcb.page_count:
+            raise ValueError(f"共享段 {segment.name} 超出进程 {pcb.process_name} 的页号范围")
+        for other_start, other in self.segment_maps.get(pcb, ()):
+            if start < other_start + other.page_count and other_start < end:
+                raise ValueError(f"共享段 {segment.name} 与 {other.name} 的映射重叠")
+        for page_index in range(start, end):
+            entry = pcb.page_table.get(page_index)
+            if entry is not None and entry["exist"] == 1:
+                raise ValueError(f"进程 {pcb.process_name} 页面 {page_index} 已在主存中，不能映射共享段")
+        self.segment_maps.setdefault(pcb, []).append((start, segment))
+        segment.attached[pcb] = start
+        log.append(f"进程 {pcb.process_name} 映射共享段 {segment.name} 到页面 {start}~{end - 1}")
+
+    def detach(self, pcb, segment: SharedSegment):
+        """解除进程对共享段的映射，段页面仍留在主存中"""
+        start = segment.attached.pop(pcb)
+        self.segment_maps[pcb].remove((start, segment))
+        if not self.segment_maps[pcb]:
+            del self.segment_maps[pcb]
+        frames = self.resident_frames.get(pcb, {})
+        for block_index, page_index in list(frames.items()):
+            if start <= page_index < start + segment.page_count:
+                self._unmap_alias(pcb, page_index, block_index)
+                del frames[block_index]
+        log.append(f"进程 {pcb.process_name} 解除共享段 {segment.name} 的映射")
+
+    def _segment_page(self, pcb, page_index):
+        """进程页面映射到共享段时返回 (段, 段内页号)，否则返回 None"""
+        for start, segment in self.segment_maps.get(pcb, ()):
+            if start <= page_index < start + segment.page_count:
+                return segment, page_index - start
+        return None
+
+    def _map_segment_page(self, pcb, page_index, segment, segment_page):
+        """进程访问共享段页面：段页面不在主存时先以段为所有者调入，再把进程页表项指向同一主存块
+
+        返回主存块号，段页面无法装入时返回 -1。
+        """
+        entry = segment.page_table[segment_page]
+        if entry["exist"] != 1 and self._load_page(segment_page, segment) < 0:
+            return -1
+        block_index = entry["frame"]
+        self.shared_frames.setdefault(block_index, {(segment, segment_page)}).add((pcb, page_index))
+        pcb.page_table[page_index]["exist"] = 1
+        pcb.page_table[page_index]["frame"] = block_index
+        self.resident_frames.setdefault(pcb, {})[block_index] = page_index
+        if self.tlb is not None:
+            self.tlb.insert(pcb, page_index, block_index)
+        log.append(f"{pcb.process_name} 页面 {page_index} 映射到共享段 {segment.name} 页面 {segment_page}（主存块 {block_index}）")
+        return block_index
+
+    def _unmap_alias(self, pcb, page_index, block_index):
+        """解除进程页面对共享块的映射，引用计数减一"""
+        pcb.page_table[page_index]["exist"] = 0
+        pcb.page_table[page_index]["frame"] = -1
+        pcb.page_table.discard(page_index)
+        if self.tlb is not None:
+            self.tlb.invalidate(pcb, page_index)
+        self._unshare(pcb, page_index, block_index)
+
+    def memory_usage(self, pcb) -> dict:
+        """进程的驻留集（页数）
+
+        rss 为映射到主存的页面数，shared 为其中与其他进程或共享段共用的页面数，
+        pss 把每个共享块按映射它的进程数均摊。
+        """
+        rss = shared = 0
+        pss = 0.0
+        for block_index in self.resident_frames.get(pcb, ()):
+            rss += 1
+            mappings = self.shared_frames.get(block_index)
+            if mappings is None:
+                pss += 1
+            else:
+                shared += 1
+                pss += 1 / sum(1 for owner, _ in mappings if not isinstance(owner, SharedSegment))
+        return {"rss": rss, "shared": shared, "private": rss - shared, "pss": pss}
+
+    def system_usage(self) -> dict:
+        """整个系统的驻留情况：各进程 rss 之和与实际占用的主存块数之差即共享节省的块数"""
+        rss_total = segment_blocks = 0
+        for owner, frames in self.resident_frames.items():
+            if isinstance(owner, SharedSegment):
+                segment_blocks += len(frames)
+            else:
+                rss_total += len(frames)
+        return {
+            "used_blocks": self.memory.used_count(),
+            "rss_total": rss_total,
+            "shared_blocks": len(self.shared_frames),
+            "segment_blocks": segment_blocks,
+        }
+
+    def refcount(self, block_index) -> int:
+        """映射该主存块的页面数"""
+        mappings = self.shared_frames.get(block_index)
+        if mappings is not None:
+            return len(mappings)
+        return 1 if self.memory.owner_of(block_index) is not None else 0
+
+    def _unshare(self, pcb, page_index, block_index):
+        """解除 pcb 对共享块的映射，引用计数减一；pcb 是所有者时把块转给另一个映射"""
+        mappings = self.shared_frames[block_index]
+        mappings.discard((pcb, page_index))
+        if self.memory.owner_of(block_index) is pcb and self.memory.page_of(block_index) == page_index:
+            owner, owner_page = next(iter(mappings))
+            dirty, referenced = self.memory.dirty[block_index], self.memory.referenced[block_index]
+            self.memory_stack.remove((pcb, page_index))
+            # 换了所有者的块重新放入置换策略，视为刚被访问
+            self.memory_stack.push((owner, owner_page),
+                                   {"block": block_index, "page": owner_page, "pcb": owner.process_name})
+            self.memory.assign(block_index, owner, owner_page)
+            self.memory.dirty[block_index], self.memory.referenced[block_index] = dirty, referenced
+        if len(mappings) == 1:
+            del self.shared_frames[block_index]
+
+    def _copy_on_write(self, pcb, page_index, block_index):
+        """写共享块：为 pcb 复制出私有块并解除共享，返回新块号"""
+        data = bytes(self._frame_view(block_index)) if self.physical_memory is not None else None
+        self._unshare(pcb, page_index, block_index)
+        del self.resident_frames[pcb][block_index]
+        if self.tlb is not None:
+            self.tlb.invalidate(pcb, page_index)
+        entry = pcb.page_table[page_index]
+        entry["exist"] = 0
+        entry["frame"] = -1
+
+        new_block = self._allocate_block(page_index, pcb)
+        self.memory_stack.push((pcb, page_index), {"block": new_block, "page": page_index, "pcb": pcb.process_name})
+        self.memory.assign(new_block, pcb, page_index)
+        if data is not None:
+            self._frame_view(new_block)[:] = data
+        entry["exist"] = 1
+        entry["frame"] = new_block
+        self.resident_frames[pcb][new_block] = page_index
+        if self.tlb is not None:
+            self.tlb.insert(pcb, page_index, new_block)
+        self.stats["cow_copies"] += 1
+        log.append(f"写时复制: {pcb.process_name} 页面 {page_index} 从共享块 {block_index} 复制到主存块 {new_block}")
+        return new_block
+
     def release_memory(self, pcb):
+        """释放进程占用的全部主存块，只访问该进程驻留的页面；共享块只减少引用计数"""
+        for _, segment in self.segment_maps.pop(pcb, ()):
+            del segment.attached[pcb]
+        for block_index, page_index in self.resident_frames.pop(pcb, {}).items():
+
+            """清空进程的页表"""
+            pcb.page_table[page_index]["exist"] = 0
+            pcb.page_table[page_index]["frame"] = -1
+            pcb.page_table.discard(page_index)  # 页表项回到初始值时回收
+            if self.tlb is not None:
+                self.tlb.invalidate(pcb, page_index)
+            if block_index in self.shared_frames:
+                self._unshare(pcb, page_index, block_index)  # 其他进程仍在使用该块
+                continue
+
+            """清空主存列表、主存栈与 bitmap"""
+            self.memory_stack.remove((pcb, page_index))
+            self.memory.clear(block_index)
+            if self.buddy is None:
+                self.free_frames.free(block_index)
+        if self.buddy is not None and pcb.begin >= 0:
+            self.buddy.free(pcb.begin)
+            pcb.begin = -1
+        self.memory.forget(pcb)
+        if self.writeback is not None:
+            self.writeback.discard_process(pcb)
+        if self.swap is not None:
+            self.swap.release(pcb.process_name)
+        if self.prefetcher is not None:
+            self.prefetcher.forget(pcb)
 
-        block_list = []
-        """清空进程的页表"""
-        for page_table_item in pcb.page_table:
-            page_table_item["exist"] = 0
-            page_table_item["frame"] = -1
-
-        """清空主存列表"""
-        for i, memory_item in enumerate(self.memory[-USABLE_BLOCKS:]):
-            # 这里的i是从0开始计数，因此需要调整回到原来的索引
-            actual_index = len(self.memory) - USABLE_BLOCKS + i
-
-            if memory_item["pcb"] == pcb:
-                memory_item["page"] = -1
-                memory_item["pcb"] = None
-                self.bitmap[actual_index] = 0
-                block_list.append(actual_index)
-
-        """清空在主存栈中的相关内容"""
-        # 创建一个需要移除的元素的集合
-        blocks_to_remove = set(block_list)
-
-        # 迭代 self.memory_stack 的副本，以避免在迭代过程中修改原 deque
-        for item in list(self.memory_stack):
-            if item["block"] in blocks_to_remove:
-                self.memory_stack.remove(item)
         log.append(f"进程 {pcb.process_name} 的页面已释放(main memory and bitmap)")
 
     def request_page(self, page_index, pcb: PCB):
         """请求单个页面并按需加载到主存"""
-        print(f"请求进程{pcb.process_name}页号{page_index}")
-        exist = pcb.page_table[page_index]['exist']
+        log.append(f"请求进程{pcb.process_name}页号{page_index}")
+        if self.tlb is not None and self.tlb.lookup(pcb, page_index) is not None:
+            exist = 1  # 快表命中，无需查页表
+        else:
+            exist = pcb.page_table[page_index]['exist']
+            if exist == 1 and self.tlb is not None:
+                self.tlb.insert(pcb, page_index, pcb.page_table[page_index]["frame"])
+        self.stats["requests"] += 1
+        mapping = self._segment_page(pcb, page_index)
+        if mapping is not None:
+            # 共享段页面以段的身份记入访问串，不同进程的访问视为同一页面
+            self.reference_trace.append((mapping[0].process_name, mapping[1]))
+        else:
+            self.reference_trace.append((pcb.process_name, page_index))
 
         if exist == 1:
             log.append(f"页面{page_index}已在主存中")
-            print(f"页面{page_index}已在主存中")
-            self._update_lru(page_index)
+            self.stats["hits"] += 1
+            self._update_replacement(page_index, pcb)
+        elif mapping is None and self._never_fits(pcb):
+            # 进程装不进主存，不算缺页，也不换出其他进程
+            log.append(f"进程 {pcb.process_name} 无法装入主存，页面 {page_index} 访问被跳过")
         else:
+            self.stats["faults"] += 1
             self._load_page(page_index, pcb)
 
-    def _load_page(self, page_index, pcb):
-        """将页面加载到主存，并进行 LRU 页面置换"""
-        if len(self.memory_stack) >= USABLE_BLOCKS:  # 主存已满
-
-            # print(f"lru前{self.memory_stack}")
-
-            evicted_item = self.memory_stack.popleft()
-            block_index = evicted_item["block"]
-            print(f"最久未使用的块号为{block_index},最久未使用的页面为{evicted_item}")
-            log.append(f"最久未使用的块号为{block_index},最久未使用的页面为{evicted_item}")
-            evicted_page = evicted_item["page"]
-            evicted_pcb = self.memory[block_index]["pcb"]
-            evicted_pcb.page_table[evicted_page]["exist"] = 0
-            evicted_pcb.page_table[evicted_page]["modification"] = 0
-            self.bitmap[block_index] = 0  # 将对应的 bitmap 位置设置为 0
-            print("LRU")
-            log.append(" ")
-            log.append("************* LRU *************")
-            log.append(f"页面置换: 驱逐{evicted_pcb.process_name} 页面 {evicted_page}")
-            # print(f"lru中:{self.memory_stack}")
-            log.append("*********** FINISH ************")
-            log.append(" ")
-            log.append(f"进程{evicted_pcb.process_name}的页面{evicted_page}的修改位为1，写回外存") if \
-                evicted_pcb.page_table[evicted_page]["modification"] == 1 else log.append(
-                f"进程{evicted_pcb.process_name}的页面{evicted_page}的修改位为0，不写回外存")
+        if self.prefetcher is not None:
+            self._prefetch(page_index, pcb, self.prefetcher.on_access(pcb, page_index, fault=exist != 1))
 
-        else:
-            block_index = MEMORY_BLOCKS - USABLE_BLOCKS  # 从基地址开始
+    def _prefetch(self, page_index, pcb, candidates):
+        """预取候选页面，主存已满且未访问的预取页面过多时停止"""
+        for candidate in candidates:
+            if not 0 <= candidate < pcb.page_count:
+                break
+            entry = pcb.page_table.get(candidate)
+            if entry is not None and entry["exist"] == 1:
+                continue
+            if self._memory_full(pcb) and not self.prefetcher.may_evict():
+                break
+            log.append(f"缺页页面{page_index}触发预取: {pcb.process_name} 页面 {candidate}")
+            if self._load_page(candidate, pcb) >= 0:
+                self.prefetcher.on_prefetch(pcb, candidate)
+
+    def _memory_full(self, pcb) -> bool:
+        """再装入 pcb 的一个页面是否需要置换其他页面
+
+        连续分配时进程的页面固定装入其连续块，只有进程还没有连续块且伙伴系统中没有足够大的空闲块时才需要置换。
+        """
+        if self.buddy is not None:
+            return pcb.begin < 0 and self.buddy.largest_free_block() < pcb.page_count
+        return len(self.free_frames) == 0
 
-            for i in range(MEMORY_BLOCKS - USABLE_BLOCKS, MEMORY_BLOCKS):
-                if self.memory[i]["pcb"] is None:
-                    block_index = i
-                    break
+    @staticmethod
+    def _resident(pcb, page_index) -> bool:
+        """页面是否驻留主存；只查页表，不为未用过的页面创建页表项"""
+        entry = pcb.page_table.get(page_index)
+        return entry is not None and entry["exist"] == 1
 
-        self.memory_stack.append({"block": block_index, "page": page_index, "pcb": pcb.process_name})
-        self.memory[block_index] = {"pcb": pcb, "page": page_index}  # 更新 memory 数组
-        self.bitmap[block_index] = 1  # 将对应的 bitmap 位置设置为 1
+    def _never_fits(self, pcb) -> bool:
+        """连续分配时进程是否比伙伴系统最大的块还大，无论换出多少进程都装不下"""
+        return self.buddy is not None and self.buddy.order_for(pcb.page_count) > self.buddy.max_order
+
+    def context_switch(self, pcb):
+        """调度器切换到 pcb 运行时调用，不带标签的快表会被清空"""
+        if self.tlb is not None:
+            self.tlb.context_switch(pcb)
+
+    def optimal_stats(self):
+        """用 OPT 重放已记录的访问串，得到相同主存块数下缺页数的下界"""
+        return simulate_opt(self.reference_trace, self.config.usable_blocks)
+
+    def miss_ratio_curve(self, max_frames=None):
+        """一次遍历已记录的访问串，得到每个主存块数下 LRU 的缺页数"""
+        return miss_ratio_curve(self.reference_trace, max_frames)
+
+    def _evict_page(self, evicted_item):
+        """把置换策略选出的页面移出主存（不归还主存块）"""
+        self.stats["evictions"] += 1
+        block_index = evicted_item["block"]
+        policy_name = self.memory_stack.name
+        log.append(f"{policy_name}选中的块号为{block_index},被置换的页面为{evicted_item}")
+        evicted_page = evicted_item["page"]
+        evicted_pcb = self.memory.owner_of(block_index)
+        self.memory.clear(block_index)
+        log.append(" ")
+        log.append(f"************* {policy_name} *************")
+        log.append(f"页面置换: 驱逐{evicted_pcb.process_name} 页面 {evicted_page}")
+        # print(f"lru中:{self.memory_stack}")
+        log.append("*********** FINISH ************")
+        log.append(" ")
+        # 共享块要从所有映射它的进程中移出，各自按修改位写回
+        for pcb, page_index in self.shared_frames.pop(block_index, ((evicted_pcb, evicted_page),)):
+            self._unmap_page(pcb, page_index, block_index)
+
+    def _unmap_page(self, pcb, page_index, block_index):
+        """被置换的块从 pcb 的页表中移出，脏页写回外存"""
+        pcb.page_table[page_index]["exist"] = 0
+        pcb.page_table[page_index]["frame"] = -1
+        del self.resident_frames[pcb][block_index]
+        if self.prefetcher is not None:
+            self.prefetcher.on_evict(pcb, page_index)
+        if self.tlb is not None:
+            self.tlb.invalidate(pcb, page_index)
+        dirty = pcb.page_table[page_index]["modification"]
+        if dirty == 1 and self.writeback is not None:
+            data = bytes(self._frame_view(block_index)) if self.swap is not None else None
+            self.writeback.enqueue(pcb, page_index, data)
+        elif dirty == 1 and self.swap is not None:
+            self.swap.page_out(pcb.process_name, page_index, self._frame_view(block_index))
+        pcb.page_table[page_index]["modification"] = 0
+        log.append(f"进程{pcb.process_name}的页面{page_index}的修改位为1，写回外存") if \
+            dirty == 1 else log.append(
+            f"进程{pcb.process_name}的页面{page_index}的修改位为0，不写回外存")
+        pcb.page_table.discard(page_index)
+
+    def _contiguous_block(self, page_index, pcb):
+        """连续分配：进程第一次缺页时由伙伴系统分配 page_count 个连续块，页面 i 固定装入 begin + i
+
+        没有足够大的连续空间时，换出最久未使用页面所属的整个进程，直到分配成功；
+        进程比伙伴系统最大的块还大时无法装入，不换出任何进程，直接返回 -1。
+        """
+        if pcb.begin < 0 and self._never_fits(pcb):
+            log.append(f"进程 {pcb.process_name} 需要 {pcb.page_count} 个连续主存块，主存无法容纳")
+            return -1
+        while pcb.begin < 0:
+            begin = self.buddy.allocate(pcb.page_count)
+            if begin >= 0:
+                pcb.begin = begin
+                log.append(f"进程 {pcb.process_name} 分配连续主存块 {begin}~{begin + pcb.page_count - 1}")
+                break
+            if len(self.memory_stack) == 0:
+                log.append(f"进程 {pcb.process_name} 需要 {pcb.page_count} 个连续主存块，主存无法容纳")
+                return -1
+            evicted_item = self.memory_stack.evict((pcb, page_index))
+            victim = self.memory.owner_of(evicted_item["block"])
+            self._evict_page(evicted_item)
+            self._swap_out(victim)
+        return pcb.begin + page_index
+
+    def _swap_out(self, pcb):
+        """连续分配下换出整个进程并归还其连续块"""
+        for page_index in list(self.resident_frames.get(pcb, {}).values()):
+            self._evict_page(self.memory_stack.remove((pcb, page_index)))
+        self.buddy.free(pcb.begin)
+        pcb.begin = -1
+        log.append(f"进程 {pcb.process_name} 被整体换出，归还连续主存块")
+
+    def _allocate_block(self, page_index, pcb):
+        """为页面取得一个主存块，主存已满时由置换策略选出被置换的页面；无法装入时返回 -1"""
+        if self.buddy is not None:
+            return self._contiguous_block(page_index, pcb)
+        if len(self.free_frames) == 0:  # 主存已满
+            evicted_item = self.memory_stack.evict((pcb, page_index))
+            self._evict_page(evicted_item)
+            self.free_frames.free(evicted_item["block"])  # 归还被驱逐的块，bitmap 置 0
+        return self.free_frames.allocate()  # O(1) 取得空闲块，bitmap 置 1
+
+    def _load_page(self, page_index, pcb):
+        """将页面加载到主存，返回主存块号，无法装入时返回 -1"""
+        mapping = self._segment_page(pcb, page_index)
+        if mapping is not None:
+            return self._map_segment_page(pcb, page_index, *mapping)
+        block_index = self._allocate_block(page_index, pcb)
+        if block_index < 0:
+            return -1
+
+        self.memory_stack.push((pcb, page_index), {"block": block_index, "page": page_index, "pcb": pcb.process_name})
+        self.memory.assign(block_index, pcb, page_index)  # 更新主存块表
+        data = self.writeback.cancel(pcb, page_index) if self.writeback is not None else None
+        if data is not None:
+            # 页面还在写回队列中，直接取回，仍为脏页
+            pcb.page_table[page_index]["modification"] = 1
+            self.memory.dirty[block_index] = 1
+            if self.swap is not None:
+                self._frame_view(block_index)[:] = data
+        elif self.swap is not None:
+            self.swap.page_in(pcb.process_name, page_index, self._frame_view(block_index))
         pcb.page_table[page_index]["exist"] = 1
         pcb.page_table[page_index]["frame"] = block_index
+        self.resident_frames.setdefault(pcb, {})[block_index] = page_index
+        if self.tlb is not None:
+            self.tlb.insert(pcb, page_index, block_index)
         log.append(f"{pcb.process_name} 页面 {page_index} 加载到主存块 {block_index}")
+        return block_index
 
         # print(f"lru后{self.memory_stack}")
 
-    def _update_lru(self, page_index):
-        """更新页面在 LRU 栈中的位置"""
-        r_item = None
-        for item in self.memory_stack:
-            if item["page"] == page_index:
-                self.memory_stack.remove(item)
-                r_item = item
-                break
-        self.memory_stack.append(r_item)
+    def _update_replacement(self, page_index, pcb):
+        """通知置换策略页面被访问（LRU 中即移到栈顶）"""
+        block_index = pcb.page_table[page_index]["frame"]
+        self.memory.referenced[block_index] = 1
+        if block_index in self.shared_frames:
+            # 共享块在置换策略中以所有者的映射为键
+            self.memory_stack.touch((self.memory.owner_of(block_index), self.memory.page_of(block_index)))
+        else:
+            self.memory_stack.touch((pcb, page_index))
@@ -1,96 +1,143 @@
+import copy
 import math
 import random
-from typing import List, Optional
-from buffer import generate_random_address, log, VIRTUAL_PAGES, PAGE_SIZE
+import sys
+from array import array
+from typing import Dict, List, Optional
+from buffer import generate_random_address, log, PAGE_SIZE, DEFAULT_CONFIG, MachineConfig
+from page_table import MultiLevelPageTable, InvertedPageTable
+from pid_allocator import PidAllocator
+from shared_segment import SharedSegment
 
 
 
+READ, WRITE, INPUT, OUTPUT = range(4)  # 指令操作码
+OPERATIONS = ("READ", "WRITE", "INPUT", "OUTPUT")
+READY, RUNNING, BLOCKED, FINISHED = range(4)  # 进程状态码
+STATES = ("Ready", "Running", "Blocked", "Finished")
+_STATE_CODES = {name: code for code, name in enumerate(STATES)}
+
+
 class PCB:
-    """进程控制块类，记录进程的基本信息"""
+    """进程控制块类，记录进程的基本信息
+
+    使用 __slots__，状态以整数状态码 state 存储，status 为对应的状态名。
+    指令集存为一个紧凑数组 code，每条指令一个 4 字节字：地址左移 2 位再或上操作码（输入输出指令地址为 -1），
+    由 instruction(index) 解出操作码、地址与页号。执行时只移动指令指针 pc，不修改数组，
+    fork 的子进程可以直接共用父进程的指令数组。任务名经 sys.intern 驻留，同名任务的进程共用一个字符串。
+    20 条指令的 PCB（不含页表）约 450 字节，原先逐条存字典时约 4.7 KB。
+    """
+
+    __slots__ = ("pid", "process_name", "arrive_time", "need_time", "task_name", "size", "begin", "page_count",
+                 "page_table", "state", "remaining_time", "page_size", "code", "pc", "memory_index")
 
-    def __init__(self, process_name: str, arrive_time: int, need_time: int, task_name: str, size: int):
+    def __init__(self, process_name: str, arrive_time: int, need_time: int, task_name: str, size: int,
+                 page_size: int = PAGE_SIZE):
+        self.pid = -1  # 进程号，由 PCBManager 分配
         self.process_name = process_name
         self.arrive_time = arrive_time
         self.need_time = need_time
-        self.task_name = task_name
+        self.task_name = sys.intern(task_name)
         self.size = size
         self.begin = -1  # 页框号的起始地址
         self.page_count = 0  # 分配的页面数
-        self.page_table = []  # 地址表 [{"page":None,"frame"：-1,"exist":0,"modification":0}]
-        self.status = "Ready"  # 默认状态为就绪
+        self.page_table = []  # 由 PCBManager 创建的稀疏页表，页表项形如 {"page":None,"frame"：-1,"exist":0,"modification":0}
+        self.state = READY  # 默认状态为就绪
         self.remaining_time = need_time  # 剩余执行时间
         self.memory_index = -1
 
         # 计算 page_total 并向上取整
-        page_total = int(math.ceil(self.size / PAGE_SIZE))
+        self.page_size = page_size
+        page_total = int(math.ceil(self.size / page_size))
         self.page_count = page_total
 
         # 指令集：生成约10条随机指令
-        self.instructions = self._generate_instruction_set()
+        self.code = self._generate_instruction_set()
+        self.pc = 0  # 下一条要执行的指令
 
     def __repr__(self):
-        return (f"PCB(process_name={self.process_name}, arrive_time={self.arrive_time}, "
+        return (f"PCB(pid={self.pid}, process_name={self.process_name}, arrive_time={self.arrive_time}, "
                 f"need_time={self.need_time}, remaining_time={self.remaining_time}, "
                 f"status={self.status}, begin={self.begin}, "
                 f"size={self.size}, page_count={self.page_count}, page_table={self.page_table}, "
                 f"instructions={self.instructions})")
 
+    @property
+    def status(self) -> str:
+        return STATES[self.state]
+
+    @status.setter
+    def status(self, name: str):
+        self.state = _STATE_CODES[name]
+
+    @property
+    def instructions(self) -> list:
+        """尚未执行的指令，每条为 {"operation": 操作名, "address": 地址}，供显示使用"""
+        return [{"operation": OPERATIONS[word & 3], "address": word >> 2} for word in self.code[self.pc:]]
+
+    def instruction(self, index: int):
+        """解出第 index 条指令，返回 (操作码, 地址, 页号)，输入输出指令的地址与页号为 -1"""
+        word = self.code[index]
+        address = word >> 2
+        return word & 3, address, address // self.page_size if address >= 0 else -1
+
     def _generate_instruction_set(self):
-        """生成一个随机指令集，每条指令以字典形式存储"""
-        instructions = []
+        """生成一个随机指令集，返回指令数组，每条指令为 地址 << 2 | 操作码"""
+        code = array("i" if self.size < 1 << 29 else "q")  # 地址放得进 4 字节时每条指令只占 4 字节
         for _ in range(20):  # 生成约 10 条指令
             # 生成随机数来决定是读写操作还是输入输出操作
             if random.random() < 0.9:  # 70% 的概率生成读写指令
-                operation = random.choice(["READ", "WRITE"])
+                operation = random.choice((READ, WRITE))
                 # 生成随机地址，0 到 32*1024
-                address = generate_random_address(self.page_count)
+                address = generate_random_address(self.page_count, self.page_size)
             else:  # 30% 的概率生成输入输出指令
-                operation = random.choice(["INPUT", "OUTPUT"])
+                operation = random.choice((INPUT, OUTPUT))
                 address = -1  # 输入输出指令地址固定为 -1
-            instructions.append({"operation": operation, "address": address})
-        return instructions
+            code.append(address << 2 | operation)
+        return code
 
-    def run(self):
-        """将状态置为运行，并执行一条指令"""
-        if self.status in ["Ready", "Blocked"]:
-            self.status = "Running"
+    def run(self) -> int:
+        """将状态置为运行，并执行一条指令，返回所执行指令的下标，没有执行指令时返回 -1"""
+        if self.state == READY or self.state == BLOCKED:
+            self.state = RUNNING
             log.append(f"当前状态 ***** {self.status} *****")
 
-        if self.status == "Running" and self.remaining_time > 0:
+        if self.state == RUNNING and self.remaining_time > 0:
             # 执行下一条指令
-            if self.instructions:
-                instruction = self.instructions.pop(0)
-                operation = instruction["operation"]
-                address = instruction["address"]
+            if self.pc < len(self.code):
+                index = self.pc
+                self.pc += 1
+                operation, address, _ = self.instruction(index)
                 log.append(" ")
                 log.append(f"------------- {self.process_name} EXECUTE --------------")
-                log.append(f"进程 {self.process_name} 执行指令: {operation}, 地址: {address}")
+                log.append(f"进程 {self.process_name} 执行指令: {OPERATIONS[operation]}, 地址: {address}")
 
                 # 根据操作类型执行对应指令
-                if operation == "READ":
+                if operation == READ:
                     self.read_memory(address)
-                elif operation == "WRITE":
+                elif operation == WRITE:
                     self.write_memory(address)
-                elif operation == "INPUT":
+                elif operation == INPUT:
                     self.input_data()
-                elif operation == "OUTPUT":
+                elif operation == OUTPUT:
                     self.output_data()
 
 
-                return instruction
+                return index
 
             else:
                 log.append(f"进程 {self.process_name} 无指令可执行")
 
         if self.remaining_time == 0:
-            self.status = "Finished"
+            self.state = FINISHED
             log.append(f"进程 {self.process_name} 已完成执行")
+        return -1
 
     def block(self):
-        self.status = "Blocked"
+        self.state = BLOCKED
 
     def ready(self):
-        self.status = "Ready"
+        self.state = READY
 
     def read_memory(self, address):
         """模拟读内存操作"""
@@ -112,40 +159,146 @@ class PCB:
 class PCBManager:
     """进程管理器类，用于管理多个 PCB"""
 
-    def __init__(self):
-        self.processes: List[PCB] = []
+    PAGE_TABLE_ENTRY = {"frame": -1, "exist": 0, "modification": 0}  # 新页表项的初始字段
+
+    def __init__(self, page_table: str = "multilevel", page_table_levels: int = 2, config: MachineConfig = None,
+                 max_pid: int = 1 << 22):
+        """
+        :param page_table: 页表类型，"multilevel" 为每个进程一张多级页表，"inverted" 为系统共用一张倒排页表
+        :param page_table_levels: 多级页表的级数
+        :param config: 机器配置，为 None 时使用 DEFAULT_CONFIG
+        :param max_pid: 最大进程号，即同时存在的进程数上限
+        """
+        self.config = config if config is not None else DEFAULT_CONFIG
+        if page_table not in ("multilevel", "inverted"):
+            raise ValueError(f"未知的页表类型: {page_table}")
+        self.page_table_type = page_table
+        self.page_table_levels = page_table_levels
+        self.inverted_page_table = InvertedPageTable() if page_table == "inverted" else None
+        self.pids = PidAllocator(max_pid)
+        self.processes: Dict[int, PCB] = {}  # 进程表 {pid: PCB}，按创建顺序
+        self._by_name: Dict[str, PCB] = {}  # 进程名索引，进程名在系统中唯一（倒排页表以 pid 区分进程，交换区、写回队列等仍以进程名区分）
+        self.segments = {}  # 共享段 {段名: SharedSegment}
         self.running_process: Optional[PCB] = None
         self.ready_queue: List[PCB] = []
         self.blocked_queue: List[PCB] = []
 
     def create_process(self, process_name: str, arrive_time: int, need_time: int, task_name: str, size: int,
                        ) -> Optional[PCB]:
-        """创建新进程并分配页面"""
-        pcb = PCB(process_name, arrive_time, need_time, task_name, size)
-
-        for i in range(pcb.page_count):
-            pcb.page_table.append({"page":i,"frame":-1,"exist":0,"modification":0})
-
-        self.processes.append(pcb)
+        """创建新进程并分配页面，进程名已存在时抛出 ValueError，进程号用完时返回 None"""
+        self._check_name(process_name)
+        pcb = PCB(process_name, arrive_time, need_time, task_name, size, self.config.page_size)
+        if not self._register(pcb):
+            return None
+        pcb.page_table = self._new_page_table(pcb)
 
         log.append(f"{pcb.process_name}进程创建成功")
         return pcb
 
+    def _new_page_table(self, pcb: PCB):
+        """页表项在第一次访问时才分配"""
+        if self.inverted_page_table is not None:
+            return self.inverted_page_table.view(pcb.pid, pcb.page_count, self.PAGE_TABLE_ENTRY)
+        return MultiLevelPageTable(pcb.page_count, self.PAGE_TABLE_ENTRY, self.page_table_levels)
+
+    def fork(self, process_name: str, child_name: str, memory_manager) -> Optional[PCB]:
+        """写时复制 fork：复制进程的 PCB，子进程与父进程共享驻留的主存块和只读的指令数组，从父进程当前的指令继续执行"""
+        parent = self._by_name.get(process_name)
+        if parent is None:
+            log.append(f"进程 {process_name} 未找到！")
+            return None
+        self._check_name(child_name)
+
+        child = copy.copy(parent)
+        child.process_name = child_name
+        child.begin = -1
+        child.status = "Ready"
+        if not self._register(child):
+            return None
+        child.page_table = self._new_page_table(child)
+        memory_manager.fork(parent, child)
+
+        log.append(f"{child.process_name}进程由{parent.process_name} fork 创建成功")
+        return child
+
+
+    def _check_name(self, process_name: str):
+        if process_name in self._by_name:
+            raise ValueError(f"进程 {process_name} 已存在")
+        if process_name.startswith("shm:"):
+            raise ValueError(f"进程名不能以 shm: 开头，该前缀留给共享段: {process_name}")
+
+    def _register(self, pcb: PCB) -> bool:
+        """分配进程号并加入进程表"""
+        pid = self.pids.allocate()
+        if pid < 0:
+            log.append(f"进程号已用完，无法创建进程 {pcb.process_name}")
+            return False
+        pcb.pid = pid
+        self.processes[pid] = pcb
+        self._by_name[pcb.process_name] = pcb
+        return True
+
+    def get_process(self, process_name: str) -> Optional[PCB]:
+        """按进程名查找进程，O(1)"""
+        return self._by_name.get(process_name)
+
+    def get_process_by_pid(self, pid: int) -> Optional[PCB]:
+        """按进程号查找进程，O(1)"""
+        return self.processes.get(pid)
 
     def terminate_process(self, process_name: str, memory_manager):
         """终止进程并释放资源"""
-
-        for pcb in self.processes:
-            if pcb.process_name == process_name:
-
-                for item in pcb.page_table:
-                    item["frame"] = -1
-                    item["exist"] = 0
-
-                memory_manager.release_memory(pcb)  #修改
-                self.processes.remove(pcb)
-                return
-
+        pcb = self._by_name.pop(process_name, None)
+        if pcb is None:
+            return
+
+        # release_memory 只清理该进程驻留的页面及其页表项
+        memory_manager.release_memory(pcb)  #修改
+        if self.inverted_page_table is not None:
+            pcb.page_table.clear()
+        del self.processes[pcb.pid]
+        self.pids.free(pcb.pid)
+
+
+    def create_segment(self, name: str, size: int) -> SharedSegment:
+        """创建命名共享段，size 为字节数"""
+        if name in self.segments:
+            raise ValueError(f"共享段 {name} 已存在")
+        segment = SharedSegment(name, self.config.page_count(size))
+        segment.pid = self.pids.allocate()  # 段与进程共用进程号空间，作为倒排页表的键
+        if segment.pid < 0:
+            raise ValueError(f"进程号已用完，无法创建共享段 {name}")
+        segment.page_table = self._new_page_table(segment)
+        self.segments[name] = segment
+        log.append(f"共享段 {name} 创建成功，共 {segment.page_count} 页")
+        return segment
+
+    def attach_segment(self, process_name: str, name: str, start: int, memory_manager):
+        """把共享段映射到进程从 start 开始的页面"""
+        pcb = self._by_name.get(process_name)
+        if pcb is None:
+            log.append(f"进程 {process_name} 未找到！")
+            return
+        memory_manager.attach(pcb, self.segments[name], start)
+
+    def detach_segment(self, process_name: str, name: str, memory_manager):
+        pcb = self._by_name.get(process_name)
+        if pcb is None:
+            log.append(f"进程 {process_name} 未找到！")
+            return
+        memory_manager.detach(pcb, self.segments[name])
+
+    def destroy_segment(self, name: str, memory_manager):
+        """销毁共享段并释放其主存块，段仍被进程映射时不能销毁"""
+        segment = self.segments[name]
+        if segment.attached:
+            raise ValueError(f"共享段 {name} 仍被 {len(segment.attached)} 个进程映射")
+        memory_manager.release_memory(segment)
+        if self.inverted_page_table is not None:
+            segment.page_table.clear()
+        self.pids.free(segment.pid)
+        del self.segments[name]
 
     def request_pages_for_process(self, process_name: str, memory_manager):
 
@@ -153,11 +306,11 @@ class PCBManager:
         log.append(f"=================={process_name} 请求调入内存====================")
 
         """根据进程名请求页面"""
-        for pcb in self.processes:
-            if pcb.process_name == process_name:
-                memory_manager.request_pages_for_process(pcb)
-                return
-        log.append(f"进程 {process_name} 未找到！")
+        pcb = self._by_name.get(process_name)
+        if pcb is None:
+            log.append(f"进程 {process_name} 未找到！")
+            return
+        memory_manager.request_pages_for_process(pcb)
 
 
 if __name__ == "__main__":
@@ -1,148 +1,233 @@
-from Modification.pcb_m import PCB, PCBManager
+from Modification.pcb_m import PCB, PCBManager, OPERATIONS, READ, WRITE, INPUT, OUTPUT, BLOCKED, FINISHED
+from itertools import islice
 from typing import List, Optional
 from buffer import log
-from buffer import address_to_page_number
+from buffer import MachineConfig
+from ready_queue import ArrivalQueue
+from block_queue import BlockQueue
+from clock import SimulatedClock
+from cpu_policy import SchedulingPolicy, make_cpu_policy, wait_time_stats
 from Modification.memory_m import MemoryManager
 
 class Scheduler:
-    """多级反馈队列调度器"""
+    """进程调度器，默认为多级反馈队列，也可换成其他调度策略（见 cpu_policy.POLICIES）"""
 
-    def __init__(self, pcb_manager: PCBManager, memory_manager: MemoryManager, time_slices: List[int] = [1, 3, 5]):
+    def __init__(self, pcb_manager: PCBManager, memory_manager: MemoryManager, time_slices: List[int] = [1, 3, 5],
+                 config: MachineConfig = None, policy="mlfq", clock: SimulatedClock = None,
+                 boost_interval: int = 0, aging_threshold: int = 0, stack_log_limit: int = 0):
         """
         :param pcb_manager: PCBManager 实例
         :param memory_manager: MemoryManager 实例
         :param time_slices: 每一级队列对应的时间片大小
+        :param config: 机器配置，为 None 时沿用 memory_manager 的配置
+        :param policy: 调度策略名（mlfq、srtf、cfs、stride、edf）或 SchedulingPolicy 实例；time_slices 只用于 mlfq
+        :param clock: 共用的模拟时钟（多核调度时各 CPU 共用），为 None 时新建
+        :param boost_interval: MLFQ 优先级提升的时钟间隔，为 0 时不提升
+        :param aging_threshold: MLFQ 低级队列进程等待多少个时钟后升一级，为 0 时不老化
+        :param stack_log_limit: 调试用，每条指令前把主存栈最先被置换的这么多个页面记入日志，为 0 时不记录
         """
+        self.config = config if config is not None else memory_manager.config
+        if pcb_manager.config.page_size != self.config.page_size or memory_manager.config.page_size != self.config.page_size:
+            raise ValueError("PCBManager、MemoryManager 与 Scheduler 的页面大小不一致")
         self.pcb_manager = pcb_manager
         self.memory_manager = memory_manager
-        self.time_slices = time_slices
-        self.feedback_queues: List[List[PCB]] = [[] for _ in time_slices]  # 初始化多级反馈队列
-        self.block_queues: List[dict] = []  # 阻塞队列，存储进程及其等待时间和下次移进的就绪队列等级
+        self.policy: SchedulingPolicy = make_cpu_policy(
+            policy, time_slices, boost_interval=boost_interval, aging_threshold=aging_threshold)  # 就绪队列由调度策略管理
+        self.time_slices = self.policy.time_slices
+        self.clock = clock if clock is not None else SimulatedClock()  # 全局模拟时钟，每执行一条指令前进一步
+        self.pending_arrivals = ArrivalQueue()  # 尚未到达的进程，按到达时间排序
+        self.block_queues = BlockQueue(self.clock)  # 阻塞队列，按唤醒时刻排序，存储进程及其等待时间和下次移进的就绪队列等级
         self.finished_queues = []
-        self.count = 0
+        self.wait_times = []  # 已完成进程在就绪队列中的总等待时钟数
+        self._ready_since = {}  # pcb -> 进入就绪队列的时刻
+        self._waited = {}  # pcb -> 目前累计的等待时钟数
+        self.current = None  # 正在运行的进程
+        self.current_level = 0  # 正在运行的进程所在的队列等级
+        self.ran = 0  # 正在运行的进程本时间片已执行的指令数
+        self.count = 0  # 已执行的指令总数（CPU 忙碌的时钟数）
+        self.stack_log_limit = stack_log_limit
 
     def create_process(self, process_name: str, arrive_time: int, need_time: int, task_name: str, size: int,
                        memory_manager: MemoryManager) -> Optional[PCB]:
         pcb = self.pcb_manager.create_process(process_name, arrive_time, need_time, task_name, size)
-        self.insert_high_priority_process(pcb)
+        if pcb is None:
+            return None
+        if arrive_time <= self.clock.now:
+            self.insert_high_priority_process(pcb)
+        else:
+            # 到达时间未到，先放入到达队列，到达时再进入就绪队列
+            self.pending_arrivals.append(pcb)
+            log.append(f"进程 {pcb.process_name} 将在时刻 {arrive_time} 到达（当前时刻 {self.clock.now}）")
+        return pcb
+
+    def next_arrival_time(self):
+        """最早的未到达进程的到达时间，没有时返回 None"""
+        pcb = self.pending_arrivals.peek()
+        return pcb.arrive_time if pcb is not None else None
+
+    def _admit_arrivals(self):
+        """把到达时间已到的进程移入最高优先级队列"""
+        while self.pending_arrivals and self.pending_arrivals.peek().arrive_time <= self.clock.now:
+            self.insert_high_priority_process(self.pending_arrivals.popleft())
+
+    def fork_process(self, process_name: str, child_name: str) -> Optional[PCB]:
+        """写时复制 fork 一个进程，子进程进入最高优先级队列"""
+        pcb = self.pcb_manager.fork(process_name, child_name, self.memory_manager)
+        if pcb is not None:
+            self.insert_high_priority_process(pcb)
         return pcb
 
+    @property
+    def feedback_queues(self) -> list:
+        """各级就绪队列的有序视图（MLFQ 第 0 级按到达时间排序，其余各级先进先出）"""
+        return self.policy.queues
+
     def add_to_ready_queue(self, pcb: PCB, queue_level: int = 0):
         """将进程添加到指定队列"""
         if 0 <= queue_level < len(self.feedback_queues):
-            self.feedback_queues[queue_level].append(pcb)
+            self.policy.add(pcb, queue_level)
+            self._ready_since[pcb] = self.clock.now
             pcb.ready()
             log.append(f"进程 {pcb.process_name} 被加入队列 {queue_level+1}（时间片: {self.time_slices[queue_level]}）")
 
-            # 如果是初级队列，则根据到达时间进行排序
-            if queue_level == 0:
-                self.feedback_queues[queue_level] = sorted(self.feedback_queues[queue_level],
-                                                           key=lambda x: x.arrive_time)
-
     def schedule(self):
-
-        # 检查阻塞队列，将等待值减一
-        self._decrement_block_queue_wait()
-
-        """主调度逻辑"""
-        for level, queue in enumerate(self.feedback_queues):
-            if queue:
-                process = queue.pop(0)
-                self._execute_process(process, level)
-                return
+        """运行一个时间片；没有可调度进程时时钟空转一步"""
+        if not self.dispatch():
+            self._advance_clock()
+
+    def dispatch(self) -> bool:
+        """主调度逻辑：由调度策略选出一个进程运行一个时间片，没有可调度进程时返回 False"""
+        picked = self.policy.pick()
+        if picked is not None:
+            process, level = picked
+            self._execute_process(process, level)
+            return True
 
         # 若所有队列均为空，则表示没有可调度进程
         log.append("当前无可调度进程")
+        return False
 
+    def _advance_clock(self):
+        """时钟前进一步，到达的进程进入就绪队列，等待到期的阻塞进程被唤醒"""
+        self.clock.tick()
+        self.policy.tick(self.clock.now)
+        self._admit_arrivals()
+        self._decrement_block_queue_wait()
 
     def _decrement_block_queue_wait(self):
-        """减少阻塞队列中进程的等待时间"""
-        i = 0
-        while i < len(self.block_queues):
-            block_queue = self.block_queues[i]
-            block_queue['wait'] -= 1
-
-            if block_queue['wait'] == 0:
-                # 等待值为 0，将进程移入其下次该移进的就绪队列
-                pcb = block_queue['pcb']
-                next_level = block_queue['next_level']
-                pcb.remaining_time -= 1
-                log.append(f"{pcb.process_name}获得I/O资源，从阻塞队列中释放,剩余时间{pcb.remaining_time}")
-                pcb.ready()
-                self.block_queues.pop(i)  # 从阻塞队列中移除
-                self.add_to_ready_queue(pcb, next_level)
-            else:
-                i += 1  # 只有当没有删除元素时才增加索引
+        """只处理等待到期的进程（时钟由 _advance_clock() 推进）"""
+        for block_queue in self.block_queues.expire():
+            # 等待值为 0，将进程移入其下次该移进的就绪队列
+            pcb = block_queue['pcb']
+            next_level = block_queue['next_level']
+            pcb.remaining_time -= 1
+            log.append(f"{pcb.process_name}获得I/O资源，从阻塞队列中释放,剩余时间{pcb.remaining_time}")
+            pcb.ready()
+            self.add_to_ready_queue(pcb, next_level)
 
     def _execute_process(self, pcb: PCB, level: int):
+        """运行进程一个时间片，每执行一条指令时钟前进一步"""
+        self._start(pcb, level)
+        while pcb.remaining_time > 0:
+            running = self._step()
+            self._advance_clock()
+            if not running:
+                break
+        self._stop()
+
+    def _start(self, pcb: PCB, level: int):
+        """把进程切换到 CPU 上，开始一个时间片"""
+        self._waited[pcb] = self._waited.get(pcb, 0) + self.clock.now - self._ready_since.pop(pcb)
+
+        """进程切换（快表按需清空）"""
+        self.memory_manager.context_switch(pcb)
+
         """页面请求"""
         self.pcb_manager.request_pages_for_process(pcb.process_name, self.memory_manager)
 
-        """执行进程"""
-        time_slice = self.time_slices[level]
-        for _ in range(time_slice):
-
+        self.current = pcb
+        self.current_level = level
+        self.ran = 0
 
-            page_values = [entry["page"] for entry in self.memory_manager.memory_stack]
+    def _step(self) -> bool:
+        """当前进程执行一条指令，返回时间片是否还能继续"""
+        pcb, level = self.current, self.current_level
+        if self.stack_log_limit:
+            # 只取主存栈的前缀，每条指令的开销与主存块数无关
+            page_values = [entry["page"] for entry in islice(self.memory_manager.memory_stack, self.stack_log_limit)]
             log.append(" ")
             log.append(f"当前主存栈为{page_values}")
 
-            if pcb.remaining_time > 0:
-                executed_instruction = pcb.run()
-                if executed_instruction:  # 如果run方法返回了指令，则处理指令
-                    operation = executed_instruction["operation"]
-                    address = executed_instruction["address"]
-                    if operation in ["READ", "WRITE"]:
-                        page_number = address_to_page_number(address)  # 假设address_to_page是将地址转换为页号的函数
-
-                        if operation == "WRITE":
-                            self.memory_manager.deal_with_write(pcb,page_number)
-
-                        self.memory_manager.request_page(page_number,pcb)  # 请求页号
-                        log.append(f"进程 {pcb.process_name} 执行{operation}指令,请求页面 {page_number}")
-                        # 执行完毕后减少剩余时间
-                        pcb.remaining_time -= 1
-                    elif operation in ["INPUT", "OUTPUT"]:
-                        pcb.block()
-                        self.block_queues.append(
-                            {'pcb': pcb, 'wait': 3, 'next_level': min(level + 1, len(self.feedback_queues) - 1)})
-                        log.append(f"进程 {pcb.process_name} 执行{operation}指令,阻塞进程")
-                        log.append("--------------- FINSIH ---------------")
-                        log.append(" ")
-                        break
-
-                log.append(f"进程 {pcb.process_name} 执行中，剩余时间: {pcb.remaining_time}")
+        self.ran += 1
+        self.count += 1
+        index = pcb.run()
+        if index >= 0:  # 如果run方法执行了指令，则处理指令
+            operation, address, page_number = pcb.instruction(index)
+            if operation == READ or operation == WRITE:
+                # 先请求页面（缺页时调入主存），再在驻留的主存块上读写
+                self.memory_manager.request_page(page_number,pcb)  # 请求页号
+
+                if operation == WRITE:
+                    self.memory_manager.deal_with_write(pcb,page_number,address)
+                else:
+                    self.memory_manager.deal_with_read(pcb,page_number,address)
+
+                log.append(f"进程 {pcb.process_name} 执行{OPERATIONS[operation]}指令,请求页面 {page_number}")
+                # 执行完毕后减少剩余时间
+                pcb.remaining_time -= 1
+            elif operation == INPUT or operation == OUTPUT:
+                pcb.block()
+                self.block_queues.append(
+                    {'pcb': pcb, 'wait': 3, 'next_level': self.policy.charge(pcb, level, self.ran)})
+                log.append(f"进程 {pcb.process_name} 执行{OPERATIONS[operation]}指令,阻塞进程")
                 log.append("--------------- FINSIH ---------------")
                 log.append(" ")
+                return False
 
-            else:
-                break
+        log.append(f"进程 {pcb.process_name} 执行中，剩余时间: {pcb.remaining_time}")
+        log.append("--------------- FINSIH ---------------")
+        log.append(" ")
+        return pcb.remaining_time > 0 and self.ran < self.policy.time_slice(level)
 
-        """判断执行结果"""
+    def _stop(self):
+        """时间片结束，判断执行结果"""
+        pcb, level = self.current, self.current_level
+        self.current = None
         if pcb.remaining_time == 0:
             # 进程完成，释放资源
-            pcb.status = "Finished"
+            pcb.state = FINISHED
             log.append(f"进程 {pcb.process_name} 已完成执行")
             self.pcb_manager.terminate_process(pcb.process_name, self.memory_manager)
+            self.policy.forget(pcb)
             self.finished_queues.append(pcb)
+            self.wait_times.append(self._waited.pop(pcb, 0))
             log.append(f"进程 {pcb.process_name} 执行完成并被销毁")
         else:
-            if pcb.status != "Blocked":
+            if pcb.state != BLOCKED:
                 pcb.ready()
-                # 时间片用尽，将其降级到下一队列
-                next_level = min(level + 1, len(self.feedback_queues) - 1)
+                # 时间片用尽，由调度策略记账并决定下次进入的队列（MLFQ 降一级）
+                next_level = self.policy.charge(pcb, level, self.ran)
                 self.add_to_ready_queue(pcb, next_level)
 
     def terminate_process(self, process_name: str):
-        for queue in self.feedback_queues:
+        for queue in (*self.feedback_queues, self.pending_arrivals):
             for pcb in queue:
                 if pcb.process_name == process_name:
                     self.pcb_manager.terminate_process(process_name, self.memory_manager)
-                    queue.remove(pcb)
+                    if queue is self.pending_arrivals:
+                        queue.remove(pcb)
+                    else:
+                        self.policy.remove(pcb)
+                        self._ready_since.pop(pcb, None)
+                        self._waited.pop(pcb, None)
                     log.append(f"将进程{pcb.process_name}销毁并释放内存")
                     return
         log.append(f"并没有找到{process_name}进程")
 
+    def waiting_time_stats(self) -> dict:
+        """已完成进程等待时间（在就绪队列中的时钟数）的分布：p50、p99、最大值"""
+        return wait_time_stats(self.wait_times)
+
     def block_process(self, pcb: PCB):
         """阻塞进程"""
         # 这里可以添加阻塞进程的其他处理逻辑
@@ -1,10 +1,9 @@
 import sys
 import random
-from collections import deque
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QSplitter, QHBoxLayout, \
     QLabel, QLineEdit, QFormLayout, QPushButton, QDialog, QScrollArea, QHeaderView
 from PyQt5.QtCore import Qt, QTimer
-from buffer import log, VIRTUAL_PAGES, PAGE_SIZE, MEMORY_BLOCKS, USABLE_BLOCKS
+from buffer import log
 from Modification.memory_m import MemoryManager
 
 
@@ -25,7 +24,7 @@ class MemoryManagerGUI(QWidget):
 
         # 内存页表
         self.page_table = QTableWidget(self)
-        self.page_table.setRowCount(MEMORY_BLOCKS)  # 显示完整的内存块列表
+        self.page_table.setRowCount(self.memory_manager.config.memory_blocks)  # 显示完整的内存块列表
         self.page_table.setColumnCount(3)
         self.page_table.setHorizontalHeaderLabels(["物理块", "进程", "页面号"])
         self.page_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -33,7 +32,7 @@ class MemoryManagerGUI(QWidget):
 
         # 内存栈
         self.memory_stack_table = QTableWidget(self)
-        self.memory_stack_table.setRowCount(USABLE_BLOCKS)
+        self.memory_stack_table.setRowCount(self.memory_manager.config.usable_blocks)
         self.memory_stack_table.setColumnCount(2)
         self.memory_stack_table.setHorizontalHeaderLabels(["页面", "对应主存块"])
         self.memory_stack_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -50,10 +49,11 @@ class MemoryManagerGUI(QWidget):
     def updateMemoryStatus(self):
         """更新内存页表和内存栈的状态"""
 
+        config = self.memory_manager.config
         # 更新内存页表
-        for i in range(MEMORY_BLOCKS):
-            if i < MEMORY_BLOCKS - USABLE_BLOCKS:
-                # 前 (MEMORY_BLOCKS - USABLE_BLOCKS) 个块显示固定内容
+        for i in range(config.memory_blocks):
+            if i < config.memory_blocks - config.usable_blocks:
+                # 前 (memory_blocks - usable_blocks) 个块显示固定内容
                 process_name = "p10"
                 page = i % 10
             else:
@@ -66,24 +66,20 @@ class MemoryManagerGUI(QWidget):
             self.page_table.setItem(i, 1, QTableWidgetItem(process_name))  # 进程
             self.page_table.setItem(i, 2, QTableWidgetItem(str(page)))  # 页面号
 
-        # 更新内存栈
-        for i in range(USABLE_BLOCKS):
-            if not self.memory_manager.memory_stack:
-                # 如果内存栈为空
-                self.memory_stack_table.setItem(i, 0, QTableWidgetItem("None"))
-                self.memory_stack_table.setItem(i, 1, QTableWidgetItem("None"))
+        # 更新内存栈（主存栈不支持下标访问，按 LRU 顺序迭代）
+        stack_items = iter(self.memory_manager.memory_stack)
+        for i in range(config.usable_blocks):
+            item = next(stack_items, None)
+            if item is not None:
+                page = item.get("page", "None")
+                block = item.get("block", "None")
             else:
-                # 如果内存栈中存在内容
-                if i < len(self.memory_manager.memory_stack):
-                    item = self.memory_manager.memory_stack[i]
-                    page = item.get("page", "None")
-                    block = item.get("block", "None")
-                else:
-                    page = "None"
-                    block = "None"
-
-                self.memory_stack_table.setItem(i, 0, QTableWidgetItem(str(page)))
-                self.memory_stack_table.setItem(i, 1, QTableWidgetItem(str(block)))
+                # 如果内存栈中没有更多内容
+                page = "None"
+                block = "None"
+
+            self.memory_stack_table.setItem(i, 0, QTableWidgetItem(str(page)))
+            self.memory_stack_table.setItem(i, 1, QTableWidgetItem(str(block)))
 
 
 
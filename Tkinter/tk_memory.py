@@ -1,7 +1,6 @@
 import random
 import tkinter as tk
 from tkinter import ttk
-from buffer import USABLE_BLOCKS, MEMORY_BLOCKS
 from memory import MemoryManager
 
 
@@ -76,9 +75,10 @@ class MemoryViewer(tk.Frame):
         for row in self.page_table_tree.get_children():
             self.page_table_tree.delete(row)
 
+        config = self.memory_manager.config
         for i, entry in enumerate(self.memory_manager.memory):
-            if i < MEMORY_BLOCKS - USABLE_BLOCKS:
-                # 前 MEMORY_BLOCKS - USABLE_BLOCKS 个条目填充随机的进程名和页号
+            if i < config.memory_blocks - config.usable_blocks:
+                # 前 memory_blocks - usable_blocks 个条目填充随机的进程名和页号
                 self.page_table_tree.insert("", "end", values=(i, "Full", i%10))
             else:
                 # 其余的条目使用原本的 process_name 和 entry["page"]
@@ -132,7 +132,7 @@ class ProcessListWindow(tk.Frame):
             self.process_table.delete(row)
 
         # 获取进程并填充表格
-        for pcb in self.pcb_manager.processes:
+        for pcb in self.pcb_manager.processes.values():
             self.process_table.insert("", "end", values=(pcb.process_name, pcb.arrive_time, pcb.remaining_time))
 
     def refresh_process_list(self):
@@ -149,12 +149,8 @@ class ProcessListWindow(tk.Frame):
             item_values = self.process_table.item(selected_item[0], "values")
             process_name = item_values[0]
 
-            # 遍历所有进程列表，找到与进程名称匹配的 PCB 对象
-            selected_pcb = None
-            for pcb in self.pcb_manager.processes:
-                if pcb.process_name == process_name:
-                    selected_pcb = pcb
-                    break
+            # 按进程名称查找 PCB 对象
+            selected_pcb = self.pcb_manager.get_process(process_name)
 
             if selected_pcb:
                 ProcessInfoWindow(selected_pcb, self)
@@ -167,13 +163,10 @@ class PCBApp(tk.Tk):
         self.title("进程控制块展示")
         self.geometry("400x300")
 
-        pcb1 = PCB("进程1", 0, 50, "任务A", 1000)
-        pcb2 = PCB("进程2", 5, 30, "任务B", 800)
-
         # 创建 PCBManager 并添加进程
         self.pcb_manager = PCBManager()
-        self.pcb_manager.processes.append(pcb1)
-        self.pcb_manager.processes.append(pcb2)
+        self.pcb_manager.create_process("进程1", 0, 50, "任务A", 1000)
+        self.pcb_manager.create_process("进程2", 5, 30, "任务B", 800)
 
         # 创建进程列表窗口并嵌入到主窗口
         self.process_list_window = ProcessListWindow(self, self.pcb_manager)
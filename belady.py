@@ -0,0 +1,53 @@
+import heapq
+
+"""Belady 最佳置换（OPT）离线模拟"""
+
+
+def next_use_indexes(trace):
+    """对访问串的每个位置求同一页面下一次被访问的位置，不再访问时为 len(trace)，O(n)"""
+    n = len(trace)
+    next_use = [n] * n
+    last_seen = {}
+    for i in range(n - 1, -1, -1):
+        key = trace[i]
+        next_use[i] = last_seen.get(key, n)
+        last_seen[key] = i
+    return next_use
+
+
+def simulate_opt(trace, frames: int) -> dict:
+    """
+    在 frames 个主存块上用 OPT 重放访问串，O(n log n)。
+
+    每次置换下一次访问最远的页面：驻留页面按下一次访问位置放入最大堆，
+    命中时压入新位置，旧的堆元素在弹出时被跳过（延迟删除）。
+
+    :param trace: 页面访问串，元素为 (进程名, 页号)，即 MemoryManager.reference_trace
+    :param frames: 主存块数
+    :return: 与 MemoryManager.stats 相同格式的统计 {"requests", "hits", "faults", "evictions"}
+    """
+    if frames <= 0:
+        raise ValueError("主存块数必须大于 0")
+
+    stats = {"requests": 0, "hits": 0, "faults": 0, "evictions": 0}
+    next_use = next_use_indexes(trace)
+    resident = {}  # key -> 该页面当前的下一次访问位置
+    heap = []  # (-下一次访问位置, key)
+
+    for i, key in enumerate(trace):
+        stats["requests"] += 1
+        if key in resident:
+            stats["hits"] += 1
+        else:
+            stats["faults"] += 1
+            if len(resident) >= frames:
+                while True:
+                    neg_use, victim = heapq.heappop(heap)
+                    if resident.get(victim) == -neg_use:
+                        break
+                del resident[victim]
+                stats["evictions"] += 1
+        resident[key] = next_use[i]
+        heapq.heappush(heap, (-next_use[i], key))
+
+    return stats
@@ -0,0 +1,70 @@
+import heapq
+from itertools import count
+
+from clock import SimulatedClock
+
+"""阻塞队列"""
+
+
+class BlockQueue:
+    """按绝对唤醒时刻排序的阻塞队列（最小堆）
+
+    元素仍是 {"pcb", "wait", "next_level"} 字典：入队时 wait 为需要等待的时钟数，
+    队列据此算出唤醒时刻 "wake"。每次 tick 只弹出到期的进程，不再逐个递减等待值，
+    单次 tick 的代价与被唤醒的进程数成正比。同一时刻到期的进程按入队顺序唤醒。
+    迭代按唤醒顺序返回元素，并把 wait 刷新为剩余等待时间，供 GUI 显示。
+    """
+
+    def __init__(self, clock: SimulatedClock = None):
+        """
+        :param clock: 共用的模拟时钟，为 None 时使用独立的时钟
+        """
+        self.clock = clock if clock is not None else SimulatedClock()
+        self._heap = []  # [(唤醒时刻, 入队序号, 元素), ...]
+        self._seq = count()
+
+    @property
+    def now(self) -> int:
+        return self.clock.now
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __iter__(self):
+        for wake, _, entry in sorted(self._heap):
+            entry["wait"] = wake - self.now
+            yield entry
+
+    def __repr__(self):
+        return f"BlockQueue(now={self.now}, {list(self)})"
+
+    def append(self, entry: dict):
+        """阻塞一个进程，entry["wait"] 个时钟后唤醒"""
+        if entry["wait"] <= 0:
+            raise ValueError("等待时间必须大于 0")
+        entry["wake"] = self.now + entry["wait"]
+        heapq.heappush(self._heap, (entry["wake"], next(self._seq), entry))
+
+    def next_wake(self):
+        """最早的唤醒时刻，队列为空时返回 None"""
+        return self._heap[0][0] if self._heap else None
+
+    def advance(self, now: int):
+        """空闲时把时钟直接拨到 now，不能越过尚未唤醒的进程"""
+        if self._heap and self._heap[0][0] <= now:
+            raise ValueError(f"时刻 {now} 之前还有进程需要唤醒")
+        self.clock.advance(now)
+
+    def tick(self) -> list:
+        """时钟前进一步，返回到期的元素（按唤醒顺序）并移出队列"""
+        self.clock.tick()
+        return self.expire()
+
+    def expire(self) -> list:
+        """返回已到期的元素（按唤醒顺序）并移出队列，不推进时钟"""
+        expired = []
+        while self._heap and self._heap[0][0] <= self.now:
+            entry = heapq.heappop(self._heap)[2]
+            entry["wait"] = 0
+            expired.append(entry)
+        return expired
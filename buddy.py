@@ -0,0 +1,99 @@
+"""伙伴系统：连续主存块分配"""
+
+
+class BuddyAllocator:
+    """伙伴系统分配器，分配与合并均为 O(log n)
+
+    管理块号 [start, start + size) 的主存块，每次分配 2 的幂个连续块。
+    size 不是 2 的幂时，初始空闲块按对齐拆成若干个最大的 2 的幂块。
+    与 FrameAllocator 一样共享 MemoryManager 的 bitmap，分配出去的整块（含内部碎片）标记为 1。
+    """
+
+    def __init__(self, bitmap, start: int, end: int):
+        """
+        :param bitmap: MemoryManager 的 bitmap 列表
+        :param start: 可用块的起始块号
+        :param end: 可用块的结束块号（不含）
+        """
+        self.bitmap = bitmap
+        self.start = start
+        self.size = end - start
+        self.max_order = max(0, self.size.bit_length() - 1)
+        self._free = [set() for _ in range(self.max_order + 1)]  # 每阶的空闲块（相对偏移）
+        self._allocated = {}  # 相对偏移 -> (阶, 请求块数)
+        self.free_count = self.size
+
+        offset = 0
+        while offset < self.size:
+            order = self.max_order
+            while order > 0 and (offset % (1 << order) or offset + (1 << order) > self.size):
+                order -= 1
+            self._free[order].add(offset)
+            offset += 1 << order
+
+    @staticmethod
+    def order_for(count: int) -> int:
+        """容纳 count 个块所需的阶"""
+        return max(0, (count - 1).bit_length())
+
+    def allocate(self, count: int) -> int:
+        """分配至少 count 个连续块，返回起始块号；没有足够大的空闲块时返回 -1"""
+        if count <= 0:
+            raise ValueError("分配的块数必须大于 0")
+        order = self.order_for(count)
+        current = order
+        while current <= self.max_order and not self._free[current]:
+            current += 1
+        if current > self.max_order:
+            return -1
+
+        offset = self._free[current].pop()
+        # 逐级拆分，把右半部分（伙伴）放回低一阶的空闲集合
+        while current > order:
+            current -= 1
+            self._free[current].add(offset + (1 << current))
+
+        self._allocated[offset] = (order, count)
+        self.free_count -= 1 << order
+        for i in range(self.start + offset, self.start + offset + (1 << order)):
+            self.bitmap[i] = 1
+        return self.start + offset
+
+    def free(self, block_index: int):
+        """释放 allocate 返回的整段，并与空闲的伙伴逐级合并"""
+        offset = block_index - self.start
+        order, _ = self._allocated.pop(offset)
+        self.free_count += 1 << order
+        for i in range(block_index, block_index + (1 << order)):
+            self.bitmap[i] = 0
+
+        while order < self.max_order:
+            buddy = offset ^ (1 << order)
+            if buddy not in self._free[order]:
+                break
+            self._free[order].discard(buddy)
+            offset = min(offset, buddy)
+            order += 1
+        self._free[order].add(offset)
+
+    def largest_free_block(self) -> int:
+        for order in range(self.max_order, -1, -1):
+            if self._free[order]:
+                return 1 << order
+        return 0
+
+    def fragmentation(self) -> dict:
+        """碎片统计
+
+        external：1 - 最大空闲块 / 空闲块总数，越大说明空闲空间越零碎；
+        internal：分配出去但未被请求使用的块占已分配块的比例。
+        """
+        allocated = sum(1 << order for order, _ in self._allocated.values())
+        requested = sum(count for _, count in self._allocated.values())
+        largest = self.largest_free_block()
+        return {
+            "free_blocks": self.free_count,
+            "largest_free_block": largest,
+            "external": 1 - largest / self.free_count if self.free_count else 0.0,
+            "internal": (allocated - requested) / allocated if allocated else 0.0,
+        }
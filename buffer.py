@@ -1,3 +1,4 @@
+import math
 import random
 from typing import List
 
@@ -7,9 +8,46 @@ VIRTUAL_PAGES = 64  # 虚拟页框总数
 MEMORY_BLOCKS = 64  #主存块述
 USABLE_BLOCKS = 10
 
-def generate_random_address(page_count):
+
+class MachineConfig:
+    """模拟机器的规模：页面大小、虚拟页数、主存块数与可用块数
+
+    MemoryManager、PCBManager 和 Scheduler 各自持有配置，同一解释器中可以同时运行多台不同规模的模拟机。
+    默认值即本模块的常量。
+    """
+
+    def __init__(self, page_size: int = PAGE_SIZE, virtual_pages: int = VIRTUAL_PAGES,
+                 memory_blocks: int = MEMORY_BLOCKS, usable_blocks: int = USABLE_BLOCKS):
+        """
+        :param page_size: 每页大小（字节）
+        :param virtual_pages: 虚拟页框总数
+        :param memory_blocks: 主存块总数
+        :param usable_blocks: 可分配给进程的主存块数，其余为保留块
+        """
+        if page_size <= 0 or virtual_pages <= 0:
+            raise ValueError("页面大小和虚拟页数必须大于 0")
+        if not 0 < usable_blocks <= memory_blocks:
+            raise ValueError("可用块数必须大于 0 且不超过主存块总数")
+        self.page_size = page_size
+        self.virtual_pages = virtual_pages
+        self.memory_blocks = memory_blocks
+        self.usable_blocks = usable_blocks
+
+    def __repr__(self):
+        return (f"MachineConfig(page_size={self.page_size}, virtual_pages={self.virtual_pages}, "
+                f"memory_blocks={self.memory_blocks}, usable_blocks={self.usable_blocks})")
+
+    def page_count(self, size: int) -> int:
+        """size 字节所需的页数（向上取整）"""
+        return int(math.ceil(size / self.page_size))
+
+    def address_to_page_number(self, address: int) -> int:
+        return address_to_page_number(address, self.page_size)
+
+
+def generate_random_address(page_count, page_size: int = PAGE_SIZE):
     """生成一个 0 到 32 * 1024 之间的随机整数"""
-    return random.randint(0*PAGE_SIZE, (page_count-2)*PAGE_SIZE)
+    return random.randint(0*page_size, (page_count-2)*page_size)
 
 def generate_hex_address(address):
     """生成一个十六进制地址"""
@@ -26,4 +64,7 @@ def address_to_page_number(address: int, page_size: int = PAGE_SIZE) -> int:
     """
     if address < 0:
         raise ValueError("地址不能为负数")
-    return address // page_size
\ No newline at end of file
+    return address // page_size
+
+
+DEFAULT_CONFIG = MachineConfig()  # 未指定配置时使用的默认机器
\ No newline at end of file
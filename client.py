@@ -73,7 +73,7 @@ class Client:
 
     def display_page_tables(self):
         """显示每个进程的页表"""
-        for pcb in self.pcb_manager.processes:
+        for pcb in self.pcb_manager.processes.values():
             table = PrettyTable()
             table.field_names = ["页号", "起始地址", "分配大小"]
             for page in pcb.page_table:
@@ -95,7 +95,7 @@ class Client:
     def display_bitmap(self):
         """显示bitmap，表示每个物理块的使用情况"""
         print("\nBitmap: (1 表示已占用，0 表示空闲)")
-        print(self.memory_manager.bitmap)
+        print(list(self.memory_manager.bitmap))
 
     def display_memory_stack(self):
         """显示主存栈 (LRU)"""
@@ -0,0 +1,20 @@
+"""全局模拟时钟"""
+
+
+class SimulatedClock:
+    """模拟时钟，CPU 每执行一条指令前进一步，没有可调度进程时每次 schedule() 空转一步；
+    阻塞队列、到达队列等共用同一个时钟"""
+
+    def __init__(self, now: int = 0):
+        self.now = now
+
+    def __repr__(self):
+        return f"SimulatedClock(now={self.now})"
+
+    def tick(self) -> int:
+        self.now += 1
+        return self.now
+
+    def advance(self, now: int):
+        """把时钟拨到 now，时钟不会倒退"""
+        self.now = max(self.now, now)
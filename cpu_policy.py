@@ -0,0 +1,331 @@
+from collections import deque
+
+from ready_queue import ArrivalQueue
+
+"""CPU 调度策略"""
+
+
+class SchedulingPolicy:
+    """CPU 调度策略接口
+
+    Scheduler 的就绪队列由策略管理，调度循环只通过下列方法与策略交互：
+      add(pcb, level)            进程进入就绪状态（新到达、时间片用尽或 I/O 完成）
+      pick()                     取出下一个运行的进程，返回 (pcb, level)，没有就绪进程时返回 None
+      time_slice(level)          该级的时间片（执行的指令数）
+      charge(pcb, level, ran)    进程运行了 ran 个时钟后离开 CPU，返回它下次进入就绪队列的级别
+      remove(pcb) / forget(pcb)  销毁就绪进程 / 进程结束后丢弃其记账信息
+      steal()                    多核调度时被其他 CPU 取走一个就绪进程，返回 (pcb, level) 或 None
+      detach(pcb) / attach(pcb, level, state)
+                                 进程迁移时从源 CPU 取出记账信息，再带着它进入目标 CPU 的就绪队列
+      tick(now)                  时钟前进后调用，MLFQ 在此做优先级提升与老化
+    queues 是各级就绪队列的有序视图，即 Scheduler.feedback_queues，供 GUI 显示。
+    """
+
+    name = ""
+
+    def __init__(self, time_slices):
+        self.time_slices = list(time_slices)
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues)
+
+    @property
+    def queues(self) -> list:
+        raise NotImplementedError
+
+    def add(self, pcb, level: int = 0):
+        raise NotImplementedError
+
+    def pick(self):
+        raise NotImplementedError
+
+    def time_slice(self, level: int) -> int:
+        return self.time_slices[level]
+
+    def tick(self, now: int):
+        pass
+
+    def charge(self, pcb, level: int, ran: int) -> int:
+        return level
+
+    def steal(self):
+        """从最低级的非空队列队尾取走进程，即本 CPU 最晚才会运行的进程；记账信息由 detach 取出"""
+        for level in range(len(self.queues) - 1, -1, -1):
+            if self.queues[level]:
+                return self.queues[level].pop(), level
+        return None
+
+    def detach(self, pcb):
+        """被窃取的进程离开本 CPU：丢弃本策略中的记账信息并返回，交给目标 CPU 的 attach"""
+        self.forget(pcb)
+        return None
+
+    def attach(self, pcb, level: int, state):
+        """从其他 CPU 迁移来的进程进入就绪队列，state 为源 CPU detach 返回的记账信息"""
+        self.add(pcb, level)
+
+    def remove(self, pcb):
+        for queue in self.queues:
+            if pcb in queue:
+                queue.remove(pcb)
+                self.forget(pcb)
+                return
+        raise ValueError(f"{pcb} 不在就绪队列中")
+
+    def forget(self, pcb):
+        pass
+
+
+class MLFQPolicy(SchedulingPolicy):
+    """多级反馈队列：第 0 级按到达时间排序，其余各级先进先出；用完时间片或阻塞后降一级
+
+    沉到最低级的进程可能被源源不断的新进程饿死，两种防饥饿机制（默认关闭）：
+      优先级提升：每 boost_interval 个时钟把低级队列的全部进程移回第 0 级；
+      老化：在第 k 级（k > 0）等待满 aging_threshold 个时钟的进程升到第 k - 1 级。
+    低级队列先进先出，队首就是等待最久的进程，老化只需检查各级队首；
+    每次入队的进程最多被提升一次、老化 len(time_slices) - 1 次，均摊 O(1)。
+    """
+
+    name = "MLFQ"
+
+    def __init__(self, time_slices=(2, 4, 6), boost_interval: int = 0, aging_threshold: int = 0):
+        """
+        :param time_slices: 每一级队列的时间片
+        :param boost_interval: 优先级提升的时钟间隔，为 0 时不提升
+        :param aging_threshold: 老化的等待时钟数，为 0 时不老化
+        """
+        if boost_interval < 0 or aging_threshold < 0:
+            raise ValueError("boost_interval 与 aging_threshold 不能为负数")
+        super().__init__(time_slices)
+        self._queues = [ArrivalQueue() if level == 0 else deque() for level in range(len(self.time_slices))]
+        self.boost_interval = boost_interval
+        self.aging_threshold = aging_threshold
+        self.now = 0
+        self._last_boost = 0
+        self._enqueued_at = {}  # pcb -> 进入当前队列的时刻
+        self.stats = {"boosts": 0, "boosted": 0, "aged": 0}
+
+    @property
+    def queues(self) -> list:
+        return self._queues
+
+    def add(self, pcb, level: int = 0):
+        self._queues[level].append(pcb)
+        self._enqueued_at[pcb] = self.now
+
+    def tick(self, now: int):
+        self.now = now
+        if self.boost_interval and now - self._last_boost >= self.boost_interval:
+            self._last_boost = now
+            self.stats["boosts"] += 1
+            for queue in self._queues[1:]:
+                while queue:
+                    self.stats["boosted"] += 1
+                    self.add(queue.popleft(), 0)
+        if self.aging_threshold:
+            for level in range(1, len(self._queues)):
+                queue = self._queues[level]
+                while queue and now - self._enqueued_at[queue[0]] >= self.aging_threshold:
+                    self.stats["aged"] += 1
+                    self.add(queue.popleft(), level - 1)
+
+    def forget(self, pcb):
+        self._enqueued_at.pop(pcb, None)
+
+    def pick(self):
+        for level, queue in enumerate(self._queues):
+            if queue:
+                return queue.popleft(), level
+        return None
+
+    def charge(self, pcb, level: int, ran: int) -> int:
+        return min(level + 1, len(self._queues) - 1)
+
+
+class _SingleQueuePolicy(SchedulingPolicy):
+    """只有一个按键排序的就绪队列（二叉堆）的策略，入队、出队均为 O(log n)"""
+
+    def __init__(self, quantum: int):
+        super().__init__([quantum])
+        self._queue = ArrivalQueue(key=self.key)
+
+    @property
+    def queues(self) -> list:
+        return [self._queue]
+
+    def key(self, pcb):
+        raise NotImplementedError
+
+    def add(self, pcb, level: int = 0):
+        self._queue.append(pcb)
+
+    def pick(self):
+        if not self._queue:
+            return None
+        return self._queue.popleft(), 0
+
+    def charge(self, pcb, level: int, ran: int) -> int:
+        return 0
+
+
+class SRTFPolicy(_SingleQueuePolicy):
+    """最短剩余时间优先：按 remaining_time 排序，时间片默认为 1，每个时钟都可能被更短的进程抢占"""
+
+    name = "SRTF"
+
+    def __init__(self, quantum: int = 1):
+        super().__init__(quantum)
+
+    def key(self, pcb):
+        return pcb.remaining_time
+
+
+class CFSPolicy(_SingleQueuePolicy):
+    """类 CFS 公平调度：按虚拟运行时间排序，运行 ran 个时钟后虚拟运行时间增加 ran * 1024 / 权重
+
+    新进入就绪队列的进程虚拟运行时间不低于当前最小值，避免长时间阻塞的进程回来后独占 CPU。
+    """
+
+    name = "CFS"
+    NICE_0_WEIGHT = 1024
+
+    def __init__(self, quantum: int = 3, weight=None):
+        """
+        :param quantum: 时间片
+        :param weight: pcb -> 权重的函数，默认所有进程权重为 NICE_0_WEIGHT
+        """
+        self.vruntime = {}  # pcb -> 虚拟运行时间
+        self.min_vruntime = 0.0
+        self.weight = weight if weight is not None else (lambda pcb: self.NICE_0_WEIGHT)
+        super().__init__(quantum)
+
+    def key(self, pcb):
+        return self.vruntime[pcb]
+
+    def add(self, pcb, level: int = 0):
+        self.vruntime[pcb] = max(self.vruntime.get(pcb, 0.0), self.min_vruntime)
+        super().add(pcb, level)
+
+    def pick(self):
+        picked = super().pick()
+        if picked is not None:
+            self.min_vruntime = max(self.min_vruntime, self.vruntime[picked[0]])
+        return picked
+
+    def charge(self, pcb, level: int, ran: int) -> int:
+        self.vruntime[pcb] += ran * self.NICE_0_WEIGHT / self.weight(pcb)
+        return 0
+
+    def forget(self, pcb):
+        self.vruntime.pop(pcb, None)
+
+    def detach(self, pcb):
+        """迁移时带走虚拟运行时间领先 min_vruntime 的部分，到目标 CPU 上按其 min_vruntime 恢复"""
+        return self.vruntime.pop(pcb) - self.min_vruntime
+
+    def attach(self, pcb, level: int, state):
+        self.vruntime[pcb] = self.min_vruntime + state
+        self.add(pcb, level)
+
+
+class StridePolicy(_SingleQueuePolicy):
+    """步长调度：每个进程的步长为 STRIDE1 / 票数，选行程值最小的进程运行，运行后行程值增加 ran * 步长"""
+
+    name = "STRIDE"
+    STRIDE1 = 1 << 20
+
+    def __init__(self, quantum: int = 2, tickets=None):
+        """
+        :param quantum: 时间片
+        :param tickets: pcb -> 票数的函数，默认每个进程 100 张票
+        """
+        self.passes = {}  # pcb -> 行程值
+        self.global_pass = 0
+        self.tickets = tickets if tickets is not None else (lambda pcb: 100)
+        super().__init__(quantum)
+
+    def key(self, pcb):
+        return self.passes[pcb]
+
+    def add(self, pcb, level: int = 0):
+        self.passes[pcb] = max(self.passes.get(pcb, 0), self.global_pass)
+        super().add(pcb, level)
+
+    def pick(self):
+        picked = super().pick()
+        if picked is not None:
+            self.global_pass = max(self.global_pass, self.passes[picked[0]])
+        return picked
+
+    def charge(self, pcb, level: int, ran: int) -> int:
+        self.passes[pcb] += ran * (self.STRIDE1 // self.tickets(pcb))
+        return 0
+
+    def forget(self, pcb):
+        self.passes.pop(pcb, None)
+
+    def detach(self, pcb):
+        """迁移时带走行程值领先 global_pass 的部分，到目标 CPU 上按其 global_pass 恢复"""
+        return self.passes.pop(pcb) - self.global_pass
+
+    def attach(self, pcb, level: int, state):
+        self.passes[pcb] = self.global_pass + state
+        self.add(pcb, level)
+
+
+class EDFPolicy(_SingleQueuePolicy):
+    """最早截止时间优先：默认截止时间为 arrive_time + need_time，时间片默认为 1（可抢占）"""
+
+    name = "EDF"
+
+    def __init__(self, quantum: int = 1, deadline=None):
+        """
+        :param quantum: 时间片
+        :param deadline: pcb -> 截止时间的函数
+        """
+        self.deadline = deadline if deadline is not None else (lambda pcb: pcb.arrive_time + pcb.need_time)
+        super().__init__(quantum)
+
+    def key(self, pcb):
+        return self.deadline(pcb)
+
+
+POLICIES = {
+    "mlfq": MLFQPolicy,
+    "srtf": SRTFPolicy,
+    "cfs": CFSPolicy,
+    "stride": StridePolicy,
+    "edf": EDFPolicy,
+}
+
+
+def make_cpu_policy(policy, time_slices, **options) -> SchedulingPolicy:
+    """根据策略名（见 POLICIES）或已创建的策略实例得到调度策略，time_slices 与 options（防饥饿参数）只用于 MLFQ"""
+    if isinstance(policy, SchedulingPolicy):
+        return policy
+    try:
+        policy_class = POLICIES[policy.lower()]
+    except KeyError:
+        raise ValueError(f"未知的调度策略: {policy}，可选: {', '.join(POLICIES)}")
+    if policy_class is MLFQPolicy:
+        return MLFQPolicy(time_slices, **options)
+    return policy_class()
+
+
+def wait_time_stats(wait_times) -> dict:
+    """等待时间分布：数量、平均值、p50、p99（最近秩法）与最大值"""
+    if not wait_times:
+        return {"count": 0, "mean": 0.0, "p50": 0, "p99": 0, "max": 0}
+    ordered = sorted(wait_times)
+    count = len(ordered)
+
+    def percentile(p):
+        return ordered[max(0, -(-count * p // 100) - 1)]
+
+    return {
+        "count": count,
+        "mean": sum(ordered) / count,
+        "p50": percentile(50),
+        "p99": percentile(99),
+        "max": ordered[-1],
+    }
@@ -0,0 +1,40 @@
+from array import array
+
+"""空闲主存块分配器"""
+
+
+class FrameAllocator:
+    """以空闲链表（栈）管理可用主存块，分配、释放均为 O(1)
+
+    分配器与 MemoryManager 共享同一个 bitmap 列表，分配时置 1、释放时置 0，
+    GUI 读取的 bitmap 始终与空闲链表一致。空闲链表是 int32 的 array，每块 4 字节。
+    """
+
+    def __init__(self, bitmap, start: int, end: int):
+        """
+        :param bitmap: MemoryManager 的 bitmap（bytearray，0 表示空闲，1 表示已占用）
+        :param start: 可用块的起始块号
+        :param end: 可用块的结束块号（不含）
+        """
+        self.bitmap = bitmap
+        # 倒序入栈，使得初始时总是先分配块号最小的空闲块
+        self._free = array("i", (i for i in range(end - 1, start - 1, -1) if bitmap[i] == 0))
+
+    def __len__(self):
+        """空闲块数量"""
+        return len(self._free)
+
+    def allocate(self) -> int:
+        """分配一个空闲块，返回块号；没有空闲块时返回 -1"""
+        if not self._free:
+            return -1
+        block_index = self._free.pop()
+        self.bitmap[block_index] = 1
+        return block_index
+
+    def free(self, block_index: int):
+        """释放一个块，重复释放会被忽略"""
+        if self.bitmap[block_index] == 0:
+            return
+        self.bitmap[block_index] = 0
+        self._free.append(block_index)
@@ -0,0 +1,89 @@
+from array import array
+
+"""主存块表"""
+
+FREE = -1  # 空闲块的所属进程号
+RESERVED = -2  # 系统保留块（不可分配）的所属进程号
+
+
+class FrameTable:
+    """以并列的 array 列存储每个主存块的所属进程号、页号、修改位和访问位
+
+    每块只占 10 字节（两个 int32 列加两个 int8 列），100 万块约 10 MB；
+    整表统计用 array.count 在 C 层完成。进程号由本表分配，owner_of 可取回对应的 PCB。
+    下标访问返回 {"pcb", "page", "dirty", "referenced"} 字典快照，供 GUI 显示。
+    """
+
+    def __init__(self, size: int, reserved: range = range(0)):
+        """
+        :param size: 主存块总数
+        :param reserved: 保留块的块号范围
+        """
+        self.owner = array("i", [FREE]) * size
+        self.page = array("i", [-1]) * size
+        self.dirty = array("b", [0]) * size
+        self.referenced = array("b", [0]) * size
+        if len(reserved):
+            self.owner[reserved.start:reserved.stop] = array("i", [RESERVED]) * len(reserved)
+
+        self._pcbs = {}  # 进程号 -> pcb
+        self._ids = {}  # pcb -> 进程号
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.owner)
+
+    def __getitem__(self, block_index: int) -> dict:
+        return {
+            "pcb": self.owner_of(block_index),
+            "page": self.page[block_index],
+            "dirty": self.dirty[block_index],
+            "referenced": self.referenced[block_index],
+        }
+
+    def __iter__(self):
+        for block_index in range(len(self.owner)):
+            yield self[block_index]
+
+    def is_reserved(self, block_index: int) -> bool:
+        return self.owner[block_index] == RESERVED
+
+    def owner_of(self, block_index: int):
+        """返回占用该块的 PCB，空闲或保留块返回 None"""
+        return self._pcbs.get(self.owner[block_index])
+
+    def page_of(self, block_index: int) -> int:
+        return self.page[block_index]
+
+    def _owner_id(self, pcb) -> int:
+        owner_id = self._ids.get(pcb)
+        if owner_id is None:
+            owner_id = self._next_id
+            self._next_id += 1
+            self._ids[pcb] = owner_id
+            self._pcbs[owner_id] = pcb
+        return owner_id
+
+    def assign(self, block_index: int, pcb, page_index: int):
+        """将页面装入主存块，访问位置 1，修改位清零"""
+        self.owner[block_index] = self._owner_id(pcb)
+        self.page[block_index] = page_index
+        self.dirty[block_index] = 0
+        self.referenced[block_index] = 1
+
+    def clear(self, block_index: int):
+        """将主存块置为空闲"""
+        self.owner[block_index] = FREE
+        self.page[block_index] = -1
+        self.dirty[block_index] = 0
+        self.referenced[block_index] = 0
+
+    def forget(self, pcb):
+        """进程释放全部主存块后回收其进程号映射"""
+        owner_id = self._ids.pop(pcb, None)
+        if owner_id is not None:
+            del self._pcbs[owner_id]
+
+    def used_count(self) -> int:
+        """已分配给进程的块数"""
+        return len(self.owner) - self.owner.count(FREE) - self.owner.count(RESERVED)
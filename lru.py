@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+"""主存栈（LRU）"""
+
+
+class LRUStack:
+    """以 (pcb, page) 为键的 LRU 栈，访问、插入、淘汰均为 O(1)
+
+    栈底为最久未使用的页面，栈顶为最近使用的页面。
+    每个元素是 {"block": 块号, "page": 页号, "pcb": 进程名}，与原来 deque 中的字典一致，
+    GUI 直接迭代即可按 LRU 顺序显示。
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()  # (pcb, page) -> {"block", "page", "pcb"}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        """从栈底（最久未使用）到栈顶（最近使用）迭代"""
+        return iter(self._entries.values())
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __repr__(self):
+        return f"LRUStack({list(self._entries.values())})"
+
+    def push(self, key, item):
+        """将新调入的页面压入栈顶"""
+        self._entries[key] = item
+        self._entries.move_to_end(key)
+
+    def touch(self, key):
+        """命中时将页面移到栈顶，返回对应元素；不存在时返回 None"""
+        item = self._entries.get(key)
+        if item is not None:
+            self._entries.move_to_end(key)
+        return item
+
+    def pop_lru(self):
+        """弹出栈底（最久未使用）的元素"""
+        return self._entries.popitem(last=False)[1]
+
+    def remove(self, key):
+        """移除指定页面，返回对应元素；不存在时返回 None"""
+        return self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
@@ -1,27 +1,54 @@
 import random
-from collections import deque
 
 from pcb import PCBManager,PCB
 from buffer import log
-from buffer import VIRTUAL_PAGES, PAGE_SIZE,MEMORY_BLOCKS,USABLE_BLOCKS
+from replacement import make_policy
+from frame_allocator import FrameAllocator
+from buddy import BuddyAllocator
+from frame_table import FrameTable
+from belady import simulate_opt
+from miss_ratio import miss_ratio_curve
+from buffer import DEFAULT_CONFIG, MachineConfig
 
 """内存管理器类"""
 
 
 class MemoryManager:
-
-    def __init__(self):
+    """内存管理器（原始版本）：页面没有实际内容
+
+    交换区（页面内容的换入换出）、脏页写回、写时复制 fork 与共享段只在 Modification.memory_m 中实现。
+    """
+
+    def __init__(self, policy="lru", tlb=None, prefetcher=None, allocation="paged", config: MachineConfig = None):
+        """
+        :param policy: 页面置换策略名（lru、second_chance、clock、eclock、lfu、2q、arc）或 ReplacementPolicy 实例
+        :param tlb: TLB 实例，为 None 时不模拟快表
+        :param prefetcher: Prefetcher 实例，为 None 时不预取
+        :param allocation: "paged" 为按页分配单个块；"contiguous" 为用伙伴系统给每个进程分配连续块
+        :param config: 机器配置，为 None 时使用 DEFAULT_CONFIG
+        """
+        self.config = config = config if config is not None else DEFAULT_CONFIG
+        memory_blocks, usable_blocks = config.memory_blocks, config.usable_blocks
         # 初始化 page_table
         self.page_table = [
-            {"valid": "empty", "block": -1, "used": 0} if i < VIRTUAL_PAGES // 2
+            {"valid": "empty", "block": -1, "used": 0} if i < config.virtual_pages // 2
             else {"valid": "full", "block": -1, "used": 1024}
-            for i in range(VIRTUAL_PAGES)
+            for i in range(config.virtual_pages)
         ]
-        self.memory = [{"pcb":None,"page":-1}] * USABLE_BLOCKS  # 前 USABLE_BLOCKS 个块为空
-        self.memory.extend([1] * (MEMORY_BLOCKS - USABLE_BLOCKS))  # 剩余块已满
-        self.virtual_memory = [f"Page {i} empty" for i in range(VIRTUAL_PAGES)]
-        self.bitmap = [0] * USABLE_BLOCKS + [1] * (MEMORY_BLOCKS - USABLE_BLOCKS)
-        self.memory_stack = deque()
+        # 主存块表：前 usable_blocks 个块为空，剩余块为保留块
+        self.memory = FrameTable(memory_blocks, reserved=range(usable_blocks, memory_blocks))
+        self.bitmap = bytearray(usable_blocks) + bytearray(b"\x01") * (memory_blocks - usable_blocks)  # 每块 1 字节
+        self.memory_stack = make_policy(policy, usable_blocks)  # 主存栈（页面置换策略），键为 (pcb, page)
+        if allocation not in ("paged", "contiguous"):
+            raise ValueError(f"未知的分配方式: {allocation}")
+        # 按页分配时由空闲块链表管理可用块；连续分配时由伙伴系统管理，PCB.begin 为进程的起始块号
+        self.free_frames = FrameAllocator(self.bitmap, 0, usable_blocks) if allocation == "paged" else None
+        self.buddy = BuddyAllocator(self.bitmap, 0, usable_blocks) if allocation == "contiguous" else None
+        self.resident_frames = {}  # 每个进程驻留的主存块集合 {pcb: {block, ...}}
+        self.stats = {"requests": 0, "hits": 0, "faults": 0, "evictions": 0}  # 页面访问统计
+        self.tlb = tlb  # 快表，位于页表查询之前
+        self.prefetcher = prefetcher  # 缺页时的顺序/跨步预取
+        self.reference_trace = []  # 页面访问串 [(进程名, 页号), ...]，供 OPT 等离线分析使用
 
     def request_pages_for_process(self, pcb):
         """根据 PCB 请求分配的页面"""
@@ -40,91 +67,178 @@ class MemoryManager:
         self.request_page(selected_page,pcb)
 
     def release_memory(self, pcb):
+        """释放进程占用的全部主存块，只访问该进程驻留的页面"""
+        for block_index in self.resident_frames.pop(pcb, ()):
+            page_index = self.memory.page_of(block_index)
+
+            """清空进程的页表"""
+            pcb.page_table[page_index]["exist"] = 0
+            pcb.page_table[page_index]["frame"] = -1
+            pcb.page_table.discard(page_index)  # 页表项回到初始值时回收
+
+            """清空主存列表、主存栈与 bitmap"""
+            self.memory_stack.remove((pcb, page_index))
+            if self.tlb is not None:
+                self.tlb.invalidate(pcb, page_index)
+            self.memory.clear(block_index)
+            if self.buddy is None:
+                self.free_frames.free(block_index)
+        if self.buddy is not None and pcb.begin >= 0:
+            self.buddy.free(pcb.begin)
+            pcb.begin = -1
+        self.memory.forget(pcb)
+        if self.prefetcher is not None:
+            self.prefetcher.forget(pcb)
 
-        block_list = []
-        """清空进程的页表"""
-        for page_table_item in pcb.page_table:
-            page_table_item["exist"] = 0
-            page_table_item["frame"] = -1
-
-        """清空主存列表"""
-        for i,memory_item in enumerate(self.memory[:USABLE_BLOCKS]):
-            if memory_item["pcb"] == pcb:
-                memory_item["page"] = -1
-                memory_item["pcb"] = None
-                self.bitmap[i] = 0
-                block_list.append(i)
-
-
-        """清空在主存栈中的相关内容"""
-        # 创建一个需要移除的元素的集合
-        blocks_to_remove = set(block_list)
-
-        # 迭代 self.memory_stack 的副本，以避免在迭代过程中修改原 deque
-        for item in list(self.memory_stack):
-            if item["block"] in blocks_to_remove:
-                self.memory_stack.remove(item)
         log.append(f"进程 {pcb.process_name} 的页面已释放(main memory and bitmap)")
 
 
     def request_page(self, page_index , pcb:PCB):
 
-        print(f"请求进程{pcb.process_name}页号{page_index}")
+        log.append(f"请求进程{pcb.process_name}页号{page_index}")
         """请求单个页面并按需加载到主存"""
-        exist = pcb.page_table[page_index]['exist']
+        if self.tlb is not None and self.tlb.lookup(pcb, page_index) is not None:
+            exist = 1  # 快表命中，无需查页表
+        else:
+            exist = pcb.page_table[page_index]['exist']
+            if exist == 1 and self.tlb is not None:
+                self.tlb.insert(pcb, page_index, pcb.page_table[page_index]["frame"])
+        self.stats["requests"] += 1
+        self.reference_trace.append((pcb.process_name, page_index))
 
         if exist == 1 :
             log.append(f"页面{page_index}已在主存中")
-            print(f"页面{page_index}已在主存中")
-            self._update_lru(page_index)
+            self.stats["hits"] += 1
+            self._update_replacement(page_index, pcb)
         else:
+            self.stats["faults"] += 1
             self._load_page(page_index,pcb)
 
-    def _load_page(self, page_index , pcb):
-        """将页面加载到主存，并进行 LRU 页面置换"""
-        if len(self.memory_stack) >= USABLE_BLOCKS:  # 主存已满
-
-            # print(f"lru前{self.memory_stack}")
-
-            evicted_item = self.memory_stack.popleft()
-            block_index = evicted_item["block"]
-            print(f"最久未使用的块号为{block_index},最久未使用的页面为{evicted_item}")
-            log.append(f"最久未使用的块号为{block_index},最久未使用的页面为{evicted_item}")
-            evicted_page = evicted_item["page"]
-            evicted_pcb = self.memory[block_index]["pcb"]
-            evicted_pcb.page_table[evicted_page]["exist"] = 0
-            self.bitmap[block_index] = 0  # 将对应的 bitmap 位置设置为 0
-            print("LRU")
-            log.append(" ")
-            log.append("************* LRU *************")
-            log.append(f"页面置换: 驱逐{evicted_pcb.process_name} 页面 {evicted_page}")
-            # print(f"lru中:{self.memory_stack}")
-            log.append("*********** FINISH ************")
-            log.append(" ")
-
-        else:
-            block_index = 0
+        if self.prefetcher is not None:
+            self._prefetch(page_index, pcb, self.prefetcher.on_access(pcb, page_index, fault=exist != 1))
 
-            for i in range(USABLE_BLOCKS):
-                if self.memory[i]["pcb"] is None:
-                    block_index = i
-                    break
+    def _prefetch(self, page_index, pcb, candidates):
+        """预取候选页面，主存已满且未访问的预取页面过多时停止"""
+        for candidate in candidates:
+            if not 0 <= candidate < pcb.page_count:
+                break
+            entry = pcb.page_table.get(candidate)
+            if entry is not None and entry["exist"] == 1:
+                continue
+            if self._memory_full(pcb) and not self.prefetcher.may_evict():
+                break
+            log.append(f"缺页页面{page_index}触发预取: {pcb.process_name} 页面 {candidate}")
+            if self._load_page(candidate, pcb) >= 0:
+                self.prefetcher.on_prefetch(pcb, candidate)
+
+    def _memory_full(self, pcb) -> bool:
+        """再装入 pcb 的一个页面是否需要置换其他页面
+
+        连续分配时进程的页面固定装入其连续块，只有进程还没有连续块且伙伴系统中没有足够大的空闲块时才需要置换。
+        """
+        if self.buddy is not None:
+            return pcb.begin < 0 and self.buddy.largest_free_block() < pcb.page_count
+        return len(self.free_frames) == 0
+
+    def _never_fits(self, pcb) -> bool:
+        """连续分配时进程是否比伙伴系统最大的块还大，无论换出多少进程都装不下"""
+        return self.buddy is not None and self.buddy.order_for(pcb.page_count) > self.buddy.max_order
+
+    def context_switch(self, pcb):
+        """调度器切换到 pcb 运行时调用，不带标签的快表会被清空"""
+        if self.tlb is not None:
+            self.tlb.context_switch(pcb)
+
+    def optimal_stats(self):
+        """用 OPT 重放已记录的访问串，得到相同主存块数下缺页数的下界"""
+        return simulate_opt(self.reference_trace, self.config.usable_blocks)
+
+    def miss_ratio_curve(self, max_frames=None):
+        """一次遍历已记录的访问串，得到每个主存块数下 LRU 的缺页数"""
+        return miss_ratio_curve(self.reference_trace, max_frames)
+
+    def _evict_page(self, evicted_item):
+        """把置换策略选出的页面移出主存（不归还主存块）"""
+        self.stats["evictions"] += 1
+        block_index = evicted_item["block"]
+        policy_name = self.memory_stack.name
+        log.append(f"{policy_name}选中的块号为{block_index},被置换的页面为{evicted_item}")
+        evicted_page = evicted_item["page"]
+        evicted_pcb = self.memory.owner_of(block_index)
+        self.memory.clear(block_index)
+        evicted_pcb.page_table[evicted_page]["exist"] = 0
+        evicted_pcb.page_table[evicted_page]["frame"] = -1
+        self.resident_frames[evicted_pcb].discard(block_index)
+        if self.prefetcher is not None:
+            self.prefetcher.on_evict(evicted_pcb, evicted_page)
+        if self.tlb is not None:
+            self.tlb.invalidate(evicted_pcb, evicted_page)
+        log.append(" ")
+        log.append(f"************* {policy_name} *************")
+        log.append(f"页面置换: 驱逐{evicted_pcb.process_name} 页面 {evicted_page}")
+        # print(f"lru中:{self.memory_stack}")
+        log.append("*********** FINISH ************")
+        log.append(" ")
+        evicted_pcb.page_table.discard(evicted_page)
+
+    def _contiguous_block(self, page_index, pcb):
+        """连续分配：进程第一次缺页时由伙伴系统分配 page_count 个连续块，页面 i 固定装入 begin + i
+
+        没有足够大的连续空间时，换出最久未使用页面所属的整个进程，直到分配成功；
+        进程比伙伴系统最大的块还大时无法装入，不换出任何进程，直接返回 -1。
+        """
+        if pcb.begin < 0 and self._never_fits(pcb):
+            log.append(f"进程 {pcb.process_name} 需要 {pcb.page_count} 个连续主存块，主存无法容纳")
+            return -1
+        while pcb.begin < 0:
+            begin = self.buddy.allocate(pcb.page_count)
+            if begin >= 0:
+                pcb.begin = begin
+                log.append(f"进程 {pcb.process_name} 分配连续主存块 {begin}~{begin + pcb.page_count - 1}")
+                break
+            if len(self.memory_stack) == 0:
+                log.append(f"进程 {pcb.process_name} 需要 {pcb.page_count} 个连续主存块，主存无法容纳")
+                return -1
+            evicted_item = self.memory_stack.evict((pcb, page_index))
+            victim = self.memory.owner_of(evicted_item["block"])
+            self._evict_page(evicted_item)
+            self._swap_out(victim)
+        return pcb.begin + page_index
+
+    def _swap_out(self, pcb):
+        """连续分配下换出整个进程并归还其连续块"""
+        for block_index in list(self.resident_frames.get(pcb, ())):
+            self._evict_page(self.memory_stack.remove((pcb, self.memory.page_of(block_index))))
+        self.buddy.free(pcb.begin)
+        pcb.begin = -1
+        log.append(f"进程 {pcb.process_name} 被整体换出，归还连续主存块")
 
-        self.memory_stack.append({"block":block_index,"page":page_index,"pcb":pcb.process_name})
-        self.memory[block_index] = {"pcb":pcb,"page":page_index}  # 更新 memory 数组
-        self.bitmap[block_index] = 1  # 将对应的 bitmap 位置设置为 1
+    def _load_page(self, page_index , pcb):
+        """将页面加载到主存，主存已满时由置换策略选出被置换的页面；返回主存块号，无法装入时返回 -1"""
+        if self.buddy is not None:
+            block_index = self._contiguous_block(page_index, pcb)
+            if block_index < 0:
+                return -1
+        else:
+            if len(self.free_frames) == 0:  # 主存已满
+                evicted_item = self.memory_stack.evict((pcb, page_index))
+                self._evict_page(evicted_item)
+                self.free_frames.free(evicted_item["block"])  # 归还被驱逐的块，bitmap 置 0
+            block_index = self.free_frames.allocate()  # O(1) 取得空闲块，bitmap 置 1
+
+        self.memory_stack.push((pcb, page_index), {"block":block_index,"page":page_index,"pcb":pcb.process_name})
+        self.memory.assign(block_index, pcb, page_index)  # 更新主存块表
         pcb.page_table[page_index]["exist"] = 1
         pcb.page_table[page_index]["frame"] = block_index
+        self.resident_frames.setdefault(pcb, set()).add(block_index)
+        if self.tlb is not None:
+            self.tlb.insert(pcb, page_index, block_index)
         log.append(f"{pcb.process_name} 页面 {page_index} 加载到主存块 {block_index}")
+        return block_index
 
         # print(f"lru后{self.memory_stack}")
 
-    def _update_lru(self, page_index):
-        """更新页面在 LRU 栈中的位置"""
-        r_item = None
-        for item in self.memory_stack:
-            if item["page"] == page_index:
-                self.memory_stack.remove(item)
-                r_item = item
-                break
-        self.memory_stack.append(r_item)
+    def _update_replacement(self, page_index, pcb):
+        """通知置换策略页面被访问（LRU 中即移到栈顶）"""
+        self.memory.referenced[pcb.page_table[page_index]["frame"]] = 1
+        self.memory_stack.touch((pcb, page_index))
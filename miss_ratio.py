@@ -0,0 +1,96 @@
+import csv
+
+"""LRU 缺页率曲线（Mattson 栈算法）"""
+
+
+class FenwickTree:
+    """树状数组，单点修改与前缀和均为 O(log n)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int):
+        """第 index 个位置（从 0 开始）加 delta"""
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """位置 0..index（含）的和，index 为 -1 时返回 0"""
+        total = 0
+        i = index + 1
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+def stack_distance_histogram(trace):
+    """
+    一次遍历访问串，求每次访问的 LRU 栈距离。
+
+    树状数组在每个页面最近一次被访问的位置上记 1，某次访问的栈距离即上次访问之后
+    被访问过的不同页面数加一，每次访问 O(log n)。
+
+    :param trace: 页面访问串，元素为 (进程名, 页号)
+    :return: (histogram, cold_misses)，histogram[d] 为栈距离为 d 的访问次数，
+             cold_misses 为首次访问（栈距离无穷大）的次数
+    """
+    n = len(trace)
+    tree = FenwickTree(n)
+    last_access = {}
+    histogram = {}
+    cold_misses = 0
+
+    for t, key in enumerate(trace):
+        last = last_access.get(key)
+        if last is None:
+            cold_misses += 1
+        else:
+            distance = tree.prefix_sum(t - 1) - tree.prefix_sum(last) + 1
+            histogram[distance] = histogram.get(distance, 0) + 1
+            tree.add(last, -1)
+        tree.add(t, 1)
+        last_access[key] = t
+
+    return histogram, cold_misses
+
+
+def miss_ratio_curve(trace, max_frames: int = None):
+    """
+    由栈距离直方图得到 1..max_frames 个主存块下 LRU 的缺页数。
+
+    主存块数为 F 时，栈距离大于 F 的访问以及首次访问都会缺页。
+
+    :param trace: 页面访问串，即 MemoryManager.reference_trace
+    :param max_frames: 曲线的最大主存块数，默认取访问串中不同页面的个数（之后曲线不再变化）
+    :return: [{"frames": F, "faults": 缺页数, "miss_ratio": 缺页率}, ...]
+    """
+    histogram, cold_misses = stack_distance_histogram(trace)
+    requests = len(trace)
+    if max_frames is None:
+        max_frames = max(1, len(set(trace)))
+
+    # 从大到小累加，得到栈距离大于 F 的访问次数
+    deeper = sum(count for distance, count in histogram.items() if distance > max_frames)
+    curve = []
+    for frames in range(max_frames, 0, -1):
+        faults = cold_misses + deeper
+        curve.append({
+            "frames": frames,
+            "faults": faults,
+            "miss_ratio": faults / requests if requests else 0.0,
+        })
+        deeper += histogram.get(frames, 0)
+    curve.reverse()
+    return curve
+
+
+def export_curve_csv(curve, path: str):
+    """将缺页率曲线写入 CSV 文件，便于绘图"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["frames", "faults", "miss_ratio"])
+        writer.writeheader()
+        writer.writerows(curve)
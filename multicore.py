@@ -0,0 +1,160 @@
+from buffer import log
+from clock import SimulatedClock
+from cpu_policy import wait_time_stats
+from ready_queue import ArrivalQueue
+from Modification.scheduler_m import Scheduler
+
+"""多核调度"""
+
+
+class MultiCoreScheduler:
+    """N 个 CPU 的调度器，每个 CPU 是一个带独立就绪队列和阻塞队列的 Scheduler，共用 PCBManager、MemoryManager 和模拟时钟
+
+    各 CPU 同步运行：每次 schedule() 每个 CPU 执行当前进程的一条指令（时间片用完、阻塞或结束时换下一个进程），
+    然后时钟前进一步，唤醒到期的阻塞进程。
+    新到达的进程放入就绪进程最少的 CPU；I/O 完成的进程回到原 CPU。
+    就绪队列为空的 CPU 从就绪进程最多的 CPU 窃取一个进程（work stealing），
+    每 balance_interval 个时钟做一次负载均衡，把进程从最忙的 CPU 迁移到最闲的 CPU，直到两者相差不超过 1。
+    各 CPU 共用 MemoryManager 的同一个快表，因此快表必须带地址空间标签（tagged=True），
+    否则每个 CPU 换进程时都会清空其他 CPU 正在使用的表项，命中率失去意义。
+    """
+
+    def __init__(self, pcb_manager, memory_manager, cpus: int = 4, scheduler_class=Scheduler,
+                 balance_interval: int = 10, **scheduler_kwargs):
+        """
+        :param pcb_manager: PCBManager 实例
+        :param memory_manager: MemoryManager 实例
+        :param cpus: CPU 数
+        :param scheduler_class: 单个 CPU 的调度器类，默认为 Modification.scheduler_m.Scheduler
+        :param balance_interval: 负载均衡的时钟间隔，为 0 时只靠窃取
+        :param scheduler_kwargs: 传给每个 CPU 调度器的其他参数（time_slices、policy 等）
+        """
+        if cpus <= 0:
+            raise ValueError("CPU 数必须大于 0")
+        if memory_manager.tlb is not None and not memory_manager.tlb.tagged:
+            raise ValueError("多核调度的各 CPU 共用一个快表，快表必须带地址空间标签（tagged=True）")
+        self.pcb_manager = pcb_manager
+        self.memory_manager = memory_manager
+        self.clock = SimulatedClock()
+        self.cores = [scheduler_class(pcb_manager, memory_manager, clock=self.clock, **scheduler_kwargs)
+                      for _ in range(cpus)]
+        self.pending_arrivals = ArrivalQueue()  # 尚未到达的进程，到达时才分配 CPU
+        self.balance_interval = balance_interval
+        self.finished_queues = []
+        self.idle = [False] * cpus  # 每个 CPU 上一个时钟是否空闲，只在进入空闲时记一次日志
+        self.stats = {"migrations": 0, "steals": 0, "balances": 0}
+
+    @property
+    def feedback_queues(self) -> list:
+        """所有 CPU 的就绪队列"""
+        return [queue for core in self.cores for queue in core.feedback_queues]
+
+    @property
+    def block_queues(self) -> list:
+        """所有 CPU 阻塞队列中的元素"""
+        return [entry for core in self.cores for entry in core.block_queues]
+
+    def create_process(self, process_name: str, arrive_time: int, need_time: int, task_name: str, size: int,
+                       memory_manager=None):
+        pcb = self.pcb_manager.create_process(process_name, arrive_time, need_time, task_name, size)
+        if pcb is None:
+            return None
+        if arrive_time <= self.clock.now:
+            self._place(pcb)
+        else:
+            self.pending_arrivals.append(pcb)
+        return pcb
+
+    def _place(self, pcb):
+        """新进程放入就绪进程最少的 CPU"""
+        cpu = min(range(len(self.cores)), key=lambda i: len(self.cores[i].policy))
+        self.cores[cpu].insert_high_priority_process(pcb)
+        log.append(f"进程 {pcb.process_name} 分配到 CPU {cpu}")
+
+    def _migrate(self, source: int, target: int) -> bool:
+        """把 source 上的一个就绪进程迁移到 target"""
+        picked = self.cores[source].policy.steal()
+        if picked is None:
+            return False
+        pcb, level = picked
+        victim, thief = self.cores[source], self.cores[target]
+        # CFS 的虚拟运行时间、步长调度的行程值随进程迁移，不因换 CPU 而重置
+        thief.policy.attach(pcb, level, victim.policy.detach(pcb))
+        # 等待时间从进入源 CPU 就绪队列时算起
+        thief._ready_since[pcb] = victim._ready_since.pop(pcb)
+        if pcb in victim._waited:
+            thief._waited[pcb] = victim._waited.pop(pcb)
+        self.stats["migrations"] += 1
+        log.append(f"进程 {pcb.process_name} 从 CPU {source} 迁移到 CPU {target}")
+        return True
+
+    def _balance(self):
+        """把进程从最忙的 CPU 迁移到最闲的 CPU，直到两者就绪进程数相差不超过 1"""
+        self.stats["balances"] += 1
+        while True:
+            loads = [len(core.policy) for core in self.cores]
+            busiest = max(range(len(loads)), key=loads.__getitem__)
+            idlest = min(range(len(loads)), key=loads.__getitem__)
+            if loads[busiest] - loads[idlest] <= 1 or not self._migrate(busiest, idlest):
+                return
+
+    def schedule(self):
+        """时钟前进一步，每个正在运行进程的 CPU 执行一条指令"""
+        for cpu, core in enumerate(self.cores):
+            while core.current is None:
+                if not core.policy:
+                    # 空闲 CPU 从就绪进程最多的 CPU 窃取一个进程
+                    victim = max(range(len(self.cores)), key=lambda i: len(self.cores[i].policy))
+                    if len(self.cores[victim].policy) > 0 and self._migrate(victim, cpu):
+                        self.stats["steals"] += 1
+                picked = core.policy.pick()
+                if picked is None:
+                    break
+                self.idle[cpu] = False
+                log.append(f"=========== CPU {cpu} ===========")
+                core._start(*picked)
+                if core.current.remaining_time <= 0:
+                    # 剩余时间已为 0 的进程（如 I/O 完成时用完）直接结束，接着选下一个
+                    core._stop()
+            if core.current is None:
+                # 空闲的 CPU 只在进入空闲时记一次日志，避免每个时钟都记录
+                if not self.idle[cpu]:
+                    self.idle[cpu] = True
+                    log.append(f"CPU {cpu} 空闲")
+                continue
+            if not core._step():
+                core._stop()
+        for core in self.cores:
+            self.finished_queues.extend(core.finished_queues)
+            core.finished_queues.clear()
+
+        self.clock.tick()
+        for core in self.cores:
+            core.policy.tick(self.clock.now)
+        while self.pending_arrivals and self.pending_arrivals.peek().arrive_time <= self.clock.now:
+            self._place(self.pending_arrivals.popleft())
+        for core in self.cores:
+            core._decrement_block_queue_wait()
+        if self.balance_interval and self.clock.now % self.balance_interval == 0:
+            self._balance()
+
+    def terminate_process(self, process_name: str):
+        for pcb in self.pending_arrivals:
+            if pcb.process_name == process_name:
+                self.pending_arrivals.remove(pcb)
+                self.pcb_manager.terminate_process(process_name, self.memory_manager)
+                return
+        for core in self.cores:
+            if any(pcb.process_name == process_name for queue in core.feedback_queues for pcb in queue):
+                core.terminate_process(process_name)
+                return
+        log.append(f"并没有找到{process_name}进程")
+
+    def waiting_time_stats(self) -> dict:
+        """所有 CPU 上已完成进程等待时间的分布"""
+        return wait_time_stats([wait for core in self.cores for wait in core.wait_times])
+
+    def utilization(self) -> list:
+        """每个 CPU 的利用率（执行的指令数 / 总时钟数）"""
+        ticks = self.clock.now
+        return [core.count / ticks if ticks else 0.0 for core in self.cores]
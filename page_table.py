@@ -0,0 +1,162 @@
+"""稀疏页表：多级页表与系统级倒排页表"""
+
+
+class MultiLevelPageTable:
+    """多级页表
+
+    页号按位拆分为各级目录的下标，目录和页表项都在第一次访问时才分配，
+    页表占用的内存与访问过的页面数成正比，而不是与进程大小成正比。
+    用法与原来的页表列表相同：page_table[page]["exist"]，迭代时按页号顺序返回已分配的页表项。
+    """
+
+    def __init__(self, page_count: int, template: dict, levels: int = 2):
+        """
+        :param page_count: 进程的虚拟页数
+        :param template: 新页表项的初始字段，如 {"frame": -1, "exist": 0}
+        :param levels: 页表级数
+        """
+        if levels < 1:
+            raise ValueError("页表级数必须大于 0")
+        self.page_count = page_count
+        self.template = template
+        self.levels = levels
+        total_bits = max(1, (page_count - 1).bit_length())
+        self.bits = -(-total_bits // levels)  # 每级目录的下标位数，向上取整
+        self.mask = (1 << self.bits) - 1
+        self._root = None
+        self._count = 0  # 已分配的页表项数
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return f"MultiLevelPageTable({list(self)})"
+
+    def _check(self, page_index):
+        if not 0 <= page_index < self.page_count:
+            raise IndexError(f"页号 {page_index} 超出范围 0..{self.page_count - 1}")
+
+    def _leaf(self, page_index, create: bool):
+        """返回页号所在的末级页表，create 为 False 且尚未分配时返回 None"""
+        if self._root is None:
+            if not create:
+                return None
+            self._root = [None] * (self.mask + 1)
+        node = self._root
+        for level in range(self.levels - 1, 0, -1):
+            i = (page_index >> (level * self.bits)) & self.mask
+            child = node[i]
+            if child is None:
+                if not create:
+                    return None
+                child = node[i] = [None] * (self.mask + 1)
+            node = child
+        return node
+
+    def __getitem__(self, page_index: int) -> dict:
+        """取页表项，第一次访问时分配"""
+        self._check(page_index)
+        leaf = self._leaf(page_index, create=True)
+        i = page_index & self.mask
+        entry = leaf[i]
+        if entry is None:
+            entry = leaf[i] = {"page": page_index, **self.template}
+            self._count += 1
+        return entry
+
+    def get(self, page_index: int):
+        """取页表项，未分配时返回 None 而不分配"""
+        self._check(page_index)
+        leaf = self._leaf(page_index, create=False)
+        return None if leaf is None else leaf[page_index & self.mask]
+
+    def discard(self, page_index: int):
+        """页面离开主存后，若页表项已恢复为初始值则回收"""
+        leaf = self._leaf(page_index, create=False)
+        if leaf is None:
+            return
+        i = page_index & self.mask
+        entry = leaf[i]
+        if entry is not None and entry == {"page": page_index, **self.template}:
+            leaf[i] = None
+            self._count -= 1
+
+    def __iter__(self):
+        def walk(node, level):
+            for child in node:
+                if child is None:
+                    continue
+                if level == 0:
+                    yield child
+                else:
+                    yield from walk(child, level - 1)
+
+        if self._root is not None:
+            yield from walk(self._root, self.levels - 1)
+
+
+class InvertedPageTable:
+    """系统级倒排（哈希）页表，所有进程共用一张以 (进程号 pid, 页号) 为键的散列表"""
+
+    def __init__(self):
+        self._entries = {}  # (pid, page) -> 页表项
+        self._pages = {}  # pid -> 该进程已分配页表项的页号集合
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, pid, page_index: int):
+        return self._entries.get((pid, page_index))
+
+    def view(self, pid, page_count: int, template: dict):
+        """返回某个进程的页表视图"""
+        return InvertedPageTableView(self, pid, page_count, template)
+
+
+class InvertedPageTableView:
+    """进程在倒排页表中的视图，接口与 MultiLevelPageTable 相同"""
+
+    def __init__(self, table: InvertedPageTable, pid, page_count: int, template: dict):
+        self.table = table
+        self.pid = pid
+        self.page_count = page_count
+        self.template = template
+
+    def __len__(self):
+        return len(self.table._pages.get(self.pid, ()))
+
+    def __repr__(self):
+        return f"InvertedPageTableView(pid={self.pid}, {list(self)})"
+
+    def _check(self, page_index):
+        if not 0 <= page_index < self.page_count:
+            raise IndexError(f"页号 {page_index} 超出范围 0..{self.page_count - 1}")
+
+    def __getitem__(self, page_index: int) -> dict:
+        self._check(page_index)
+        key = (self.pid, page_index)
+        entry = self.table._entries.get(key)
+        if entry is None:
+            entry = self.table._entries[key] = {"page": page_index, **self.template}
+            self.table._pages.setdefault(self.pid, set()).add(page_index)
+        return entry
+
+    def get(self, page_index: int):
+        self._check(page_index)
+        return self.table._entries.get((self.pid, page_index))
+
+    def discard(self, page_index: int):
+        key = (self.pid, page_index)
+        entry = self.table._entries.get(key)
+        if entry is not None and entry == {"page": page_index, **self.template}:
+            del self.table._entries[key]
+            self.table._pages[self.pid].discard(page_index)
+
+    def clear(self):
+        """进程销毁时删除其全部页表项"""
+        for page_index in self.table._pages.pop(self.pid, ()):
+            del self.table._entries[(self.pid, page_index)]
+
+    def __iter__(self):
+        for page_index in sorted(self.table._pages.get(self.pid, ())):
+            yield self.table._entries[(self.pid, page_index)]
@@ -0,0 +1,49 @@
+from collections import deque
+
+"""进程号分配器"""
+
+
+class PidAllocator:
+    """进程号分配器，分配、释放均为 O(1)
+
+    先按递增顺序分配从未用过的进程号，用到 max_pid 后再按释放的先后顺序复用，
+    刚释放的进程号要等其他空闲进程号都用过之后才会被再次分配，避免新旧进程混淆。
+    """
+
+    def __init__(self, max_pid: int = 1 << 22, first_pid: int = 1):
+        """
+        :param max_pid: 最大进程号（含）
+        :param first_pid: 第一个分配的进程号
+        """
+        if max_pid < first_pid:
+            raise ValueError("max_pid 不能小于 first_pid")
+        self.max_pid = max_pid
+        self._next = first_pid  # 下一个从未分配过的进程号
+        self._released = deque()  # 已释放、可复用的进程号，先释放的先复用
+        self._in_use = set()
+
+    def __len__(self):
+        """已分配的进程号数量"""
+        return len(self._in_use)
+
+    def __contains__(self, pid: int):
+        return pid in self._in_use
+
+    def allocate(self) -> int:
+        """分配一个进程号；进程号用完时返回 -1"""
+        if self._next <= self.max_pid:
+            pid = self._next
+            self._next += 1
+        elif self._released:
+            pid = self._released.popleft()
+        else:
+            return -1
+        self._in_use.add(pid)
+        return pid
+
+    def free(self, pid: int):
+        """释放进程号，重复释放会被忽略"""
+        if pid not in self._in_use:
+            return
+        self._in_use.remove(pid)
+        self._released.append(pid)
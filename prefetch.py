@@ -0,0 +1,79 @@
+"""顺序/跨步预取"""
+
+
+class Prefetcher:
+    """按进程检测访问流的步长，缺页时预先调入后续页面
+
+    同一进程连续两次访问的页号差相同即认为是顺序（步长 1）或跨步访问，
+    缺页时沿该步长预取 depth 个页面。预取页面被访问则 depth 加一，
+    未被访问就被置换或释放则 depth 减半。
+    主存没有空闲块时，尚未被访问的预取页面最多保留 max_outstanding 个，避免挤掉热点页面。
+    """
+
+    def __init__(self, max_depth: int = 4, max_outstanding: int = 2):
+        """
+        :param max_depth: 一次缺页最多预取的页面数
+        :param max_outstanding: 无空闲块时，允许驻留的未访问预取页面数上限
+        """
+        self.max_depth = max_depth
+        self.max_outstanding = max_outstanding
+        self._streams = {}  # pcb -> {"last": 上次页号, "stride": 步长, "confidence": 连续命中次数, "depth": 预取深度}
+        self._outstanding = {}  # pcb -> 已预取但尚未访问的页号集合
+        self.stats = {"prefetches": 0, "prefetch_hits": 0, "wasted": 0}
+
+    def outstanding_count(self) -> int:
+        return sum(len(pages) for pages in self._outstanding.values())
+
+    def on_access(self, pcb, page_index, fault: bool):
+        """记录一次页面访问，缺页且检测到稳定步长时返回待预取的页号列表"""
+        pages = self._outstanding.get(pcb)
+        if pages and page_index in pages:
+            pages.discard(page_index)
+            self.stats["prefetch_hits"] += 1
+            stream = self._streams.get(pcb)
+            if stream is not None:
+                stream["depth"] = min(self.max_depth, stream["depth"] + 1)
+
+        stream = self._streams.get(pcb)
+        if stream is None:
+            self._streams[pcb] = {"last": page_index, "stride": 0, "confidence": 0, "depth": 1}
+            return []
+        stride = page_index - stream["last"]
+        if stride != 0 and stride == stream["stride"]:
+            stream["confidence"] += 1
+        else:
+            stream["confidence"] = 0
+        stream["stride"] = stride
+        stream["last"] = page_index
+
+        if not fault or stream["confidence"] == 0:
+            return []
+        return [page_index + stride * i for i in range(1, stream["depth"] + 1)]
+
+    def may_evict(self) -> bool:
+        """主存已满时是否还允许为预取置换页面"""
+        return self.outstanding_count() < self.max_outstanding
+
+    def on_prefetch(self, pcb, page_index):
+        self._outstanding.setdefault(pcb, set()).add(page_index)
+        self.stats["prefetches"] += 1
+
+    def on_evict(self, pcb, page_index):
+        """页面被置换：若是未访问的预取页面则记为浪费"""
+        pages = self._outstanding.get(pcb)
+        if pages and page_index in pages:
+            pages.discard(page_index)
+            self._waste(pcb, 1)
+
+    def forget(self, pcb):
+        """进程释放内存时丢弃其访问流与未访问的预取页面"""
+        self._streams.pop(pcb, None)
+        self._waste(pcb, len(self._outstanding.pop(pcb, ())))
+
+    def _waste(self, pcb, count):
+        if count == 0:
+            return
+        self.stats["wasted"] += count
+        stream = self._streams.get(pcb)
+        if stream is not None:
+            stream["depth"] = max(1, stream["depth"] // 2)
@@ -0,0 +1,71 @@
+import heapq
+from itertools import count
+
+"""就绪队列"""
+
+
+class ArrivalQueue:
+    """按到达时间排序的就绪队列（二叉堆）
+
+    入队、出队均为 O(log n)，到达时间相同的进程按入队顺序出队。
+    接口与 collections.deque 相同（append、popleft、pop、remove、len、迭代），可与低级队列混用。
+    迭代按出队顺序返回进程，排好序的视图缓存到下一次修改，GUI 反复刷新时不必重复排序。
+    """
+
+    def __init__(self, key=lambda pcb: pcb.arrive_time):
+        """
+        :param key: 排序键，默认为进程的到达时间
+        """
+        self.key = key
+        self._heap = []  # [(排序键, 入队序号, pcb), ...]
+        self._seq = count()
+        self._view = None  # 缓存的有序视图
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __iter__(self):
+        if self._view is None:
+            self._view = [entry[2] for entry in sorted(self._heap)]
+        return iter(self._view)
+
+    def __repr__(self):
+        return f"ArrivalQueue({list(self)})"
+
+    def append(self, pcb):
+        heapq.heappush(self._heap, (self.key(pcb), next(self._seq), pcb))
+        self._view = None
+
+    def peek(self):
+        """排序键最小的进程，不出队；队列为空时返回 None"""
+        return self._heap[0][2] if self._heap else None
+
+    def popleft(self):
+        """取出排序键最小的进程，队列为空时抛出 IndexError"""
+        if not self._heap:
+            raise IndexError("pop from an empty ArrivalQueue")
+        self._view = None
+        return heapq.heappop(self._heap)[2]
+
+    def pop(self):
+        """取出排序键最大的进程，即最后一个出队的进程，O(n)，只在多核调度窃取进程时使用"""
+        if not self._heap:
+            raise IndexError("pop from an empty ArrivalQueue")
+        i = max(range(len(self._heap)), key=self._heap.__getitem__)
+        entry = self._heap[i]
+        self._heap[i] = self._heap[-1]
+        self._heap.pop()
+        heapq.heapify(self._heap)
+        self._view = None
+        return entry[2]
+
+    def remove(self, pcb):
+        """删除指定进程，O(n)，只在销毁进程时使用"""
+        for i, entry in enumerate(self._heap):
+            if entry[2] is pcb:
+                self._heap[i] = self._heap[-1]
+                self._heap.pop()
+                heapq.heapify(self._heap)
+                self._view = None
+                return
+        raise ValueError(f"{pcb} 不在队列中")
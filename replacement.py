@@ -0,0 +1,415 @@
+from collections import OrderedDict
+
+from lru import LRUStack
+
+"""页面置换策略"""
+
+
+class ReplacementPolicy:
+    """页面置换策略接口
+
+    MemoryManager 把主存栈 memory_stack 换成某个策略实例，所有策略都以 (pcb, page) 为键，
+    元素是 {"block": 块号, "page": 页号, "pcb": 进程名}：
+      push(key, item)  页面调入主存
+      touch(key)       页面命中
+      evict(key)       主存已满时选出被置换的页面并移除，key 为即将调入的页面
+      remove(key)      进程释放时移除页面
+    迭代顺序即 GUI 中主存栈的显示顺序（越靠前越先被置换）。
+    """
+
+    name = ""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity  # 可用主存块数
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __iter__(self):
+        raise NotImplementedError
+
+    def push(self, key, item):
+        raise NotImplementedError
+
+    def touch(self, key):
+        raise NotImplementedError
+
+    def evict(self, key=None):
+        raise NotImplementedError
+
+    def remove(self, key):
+        raise NotImplementedError
+
+
+class LRUPolicy(LRUStack, ReplacementPolicy):
+    """最近最久未使用"""
+
+    name = "LRU"
+
+    def __init__(self, capacity: int):
+        LRUStack.__init__(self)
+        ReplacementPolicy.__init__(self, capacity)
+
+    def evict(self, key=None):
+        return self.pop_lru()
+
+
+class SecondChancePolicy(ReplacementPolicy):
+    """第二次机会（FIFO + 访问位）：队首页面访问位为 1 时清零并移到队尾"""
+
+    name = "SECOND-CHANCE"
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self._queue = OrderedDict()  # key -> [item, 访问位]
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __iter__(self):
+        return (entry[0] for entry in self._queue.values())
+
+    def push(self, key, item):
+        self._queue[key] = [item, 0]
+
+    def touch(self, key):
+        entry = self._queue.get(key)
+        if entry is None:
+            return None
+        entry[1] = 1
+        return entry[0]
+
+    def evict(self, key=None):
+        while True:
+            victim_key, entry = next(iter(self._queue.items()))
+            if entry[1]:
+                entry[1] = 0
+                self._queue.move_to_end(victim_key)
+            else:
+                del self._queue[victim_key]
+                return entry[0]
+
+    def remove(self, key):
+        entry = self._queue.pop(key, None)
+        return entry[0] if entry is not None else None
+
+
+class ClockPolicy(ReplacementPolicy):
+    """CLOCK：页面放在环形缓冲区中，指针扫过访问位为 1 的页面时清零，遇到 0 则置换"""
+
+    name = "CLOCK"
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self._keys = []  # 每个槽的键，None 表示空槽
+        self._items = []
+        self._ref = []  # 访问位
+        self._slots = {}  # key -> 槽号
+        self._holes = []  # 空槽号
+        self._hand = 0  # 时钟指针
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __iter__(self):
+        """从时钟指针处开始按扫描顺序迭代"""
+        n = len(self._keys)
+        for i in range(n):
+            slot = (self._hand + i) % n
+            if self._keys[slot] is not None:
+                yield self._items[slot]
+
+    def push(self, key, item):
+        if self._holes:
+            slot = self._holes.pop()
+        else:
+            slot = len(self._keys)
+            self._keys.append(None)
+            self._items.append(None)
+            self._ref.append(0)
+        self._keys[slot] = key
+        self._items[slot] = item
+        self._ref[slot] = 1
+        self._slots[key] = slot
+
+    def touch(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        self._ref[slot] = 1
+        return self._items[slot]
+
+    def _take(self, slot):
+        """移除槽中的页面并返回对应元素"""
+        item = self._items[slot]
+        del self._slots[self._keys[slot]]
+        self._keys[slot] = None
+        self._items[slot] = None
+        self._ref[slot] = 0
+        self._holes.append(slot)
+        return item
+
+    def evict(self, key=None):
+        n = len(self._keys)
+        while True:
+            slot = self._hand
+            self._hand = (self._hand + 1) % n
+            if self._keys[slot] is None:
+                continue
+            if self._ref[slot]:
+                self._ref[slot] = 0
+            else:
+                return self._take(slot)
+
+    def remove(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        return self._take(slot)
+
+
+class EnhancedClockPolicy(ClockPolicy):
+    """改进型 CLOCK：按 (访问位, 修改位) 分类，优先置换 (0,0)，其次 (0,1)
+
+    修改位直接读取页表中的 "modification"（由 memory_m 的 deal_with_write 置 1），
+    没有该字段的页表视为未修改。
+    """
+
+    name = "E-CLOCK"
+
+    def _dirty(self, slot):
+        pcb, page = self._keys[slot]
+        return pcb.page_table[page].get("modification", 0)
+
+    def evict(self, key=None):
+        n = len(self._keys)
+        while True:
+            # 第一轮：寻找 (0,0)，不修改访问位
+            for i in range(n):
+                slot = (self._hand + i) % n
+                if self._keys[slot] is not None and not self._ref[slot] and not self._dirty(slot):
+                    self._hand = (slot + 1) % n
+                    return self._take(slot)
+            # 第二轮：寻找 (0,1)，并将扫过页面的访问位清零
+            for i in range(n):
+                slot = (self._hand + i) % n
+                if self._keys[slot] is None:
+                    continue
+                if not self._ref[slot]:
+                    self._hand = (slot + 1) % n
+                    return self._take(slot)
+                self._ref[slot] = 0
+
+
+class LFUPolicy(ReplacementPolicy):
+    """最不经常使用：按访问次数分桶，同一访问次数内按 LRU 置换，访问、调入、置换均为 O(1)"""
+
+    name = "LFU"
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self._freq = {}  # key -> 访问次数
+        self._buckets = {}  # 访问次数 -> OrderedDict(key -> item)
+        self._min_freq = 0
+
+    def __len__(self):
+        return len(self._freq)
+
+    def __iter__(self):
+        for freq in sorted(self._buckets):
+            yield from self._buckets[freq].values()
+
+    def _unlink(self, key, freq):
+        bucket = self._buckets[freq]
+        item = bucket.pop(key)
+        if not bucket:
+            del self._buckets[freq]
+        return item
+
+    def push(self, key, item):
+        self._freq[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = item
+        self._min_freq = 1
+
+    def touch(self, key):
+        freq = self._freq.get(key)
+        if freq is None:
+            return None
+        item = self._unlink(key, freq)
+        if self._min_freq == freq and freq not in self._buckets:
+            self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[key] = item
+        return item
+
+    def evict(self, key=None):
+        if self._min_freq not in self._buckets:
+            # 进程释放可能清空了最小的桶
+            self._min_freq = min(self._buckets)
+        victim_key, item = self._buckets[self._min_freq].popitem(last=False)
+        if not self._buckets[self._min_freq]:
+            del self._buckets[self._min_freq]
+        del self._freq[victim_key]
+        return item
+
+    def remove(self, key):
+        freq = self._freq.pop(key, None)
+        if freq is None:
+            return None
+        return self._unlink(key, freq)
+
+
+class TwoQueuePolicy(ReplacementPolicy):
+    """2Q：首次访问的页面进入 FIFO 队列 A1in，被置换后记入幽灵队列 A1out，
+    在 A1out 中再次缺页的页面进入 LRU 队列 Am
+    """
+
+    name = "2Q"
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.kin = max(1, capacity // 4)  # A1in 的目标长度
+        self.kout = max(1, capacity // 2)  # A1out 的最大长度
+        self._a1in = OrderedDict()
+        self._a1out = OrderedDict()  # 只记录键
+        self._am = OrderedDict()
+
+    def __len__(self):
+        return len(self._a1in) + len(self._am)
+
+    def __iter__(self):
+        yield from self._a1in.values()
+        yield from self._am.values()
+
+    def push(self, key, item):
+        if key in self._a1out:
+            del self._a1out[key]
+            self._am[key] = item
+        else:
+            self._a1in[key] = item
+
+    def touch(self, key):
+        item = self._am.get(key)
+        if item is not None:
+            self._am.move_to_end(key)
+            return item
+        return self._a1in.get(key)
+
+    def evict(self, key=None):
+        if len(self._a1in) > self.kin or not self._am:
+            victim_key, item = self._a1in.popitem(last=False)
+            self._a1out[victim_key] = None
+            if len(self._a1out) > self.kout:
+                self._a1out.popitem(last=False)
+            return item
+        return self._am.popitem(last=False)[1]
+
+    def remove(self, key):
+        item = self._a1in.pop(key, None)
+        if item is None:
+            item = self._am.pop(key, None)
+        return item
+
+
+class ARCPolicy(ReplacementPolicy):
+    """自适应置换（ARC）：T1/T2 分别保存访问过一次/多次的页面，B1/B2 是对应的幽灵队列，
+    根据幽灵命中自适应调整 T1 的目标长度 p
+    """
+
+    name = "ARC"
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.p = 0  # T1 的目标长度
+        self._t1 = OrderedDict()
+        self._t2 = OrderedDict()
+        self._b1 = OrderedDict()  # 只记录键
+        self._b2 = OrderedDict()
+        self._adapted = None  # 已在 evict 中完成自适应的键，避免 push 时重复调整
+
+    def __len__(self):
+        return len(self._t1) + len(self._t2)
+
+    def __iter__(self):
+        yield from self._t1.values()
+        yield from self._t2.values()
+
+    def _adapt(self, key):
+        """幽灵命中时调整 p"""
+        if key == self._adapted:
+            return
+        self._adapted = key
+        if key in self._b1:
+            delta = max(1, len(self._b2) // len(self._b1))
+            self.p = min(self.capacity, self.p + delta)
+        elif key in self._b2:
+            delta = max(1, len(self._b1) // len(self._b2))
+            self.p = max(0, self.p - delta)
+
+    def push(self, key, item):
+        self._adapt(key)
+        self._adapted = None
+        if key in self._b1:
+            del self._b1[key]
+            self._t2[key] = item
+        elif key in self._b2:
+            del self._b2[key]
+            self._t2[key] = item
+        else:
+            self._t1[key] = item
+        # 维持 |T1|+|B1| <= c 且总长度 <= 2c
+        while len(self._t1) + len(self._b1) > self.capacity and self._b1:
+            self._b1.popitem(last=False)
+        while len(self) + len(self._b1) + len(self._b2) > 2 * self.capacity and self._b2:
+            self._b2.popitem(last=False)
+
+    def touch(self, key):
+        item = self._t1.pop(key, None)
+        if item is not None:
+            self._t2[key] = item
+            return item
+        item = self._t2.get(key)
+        if item is not None:
+            self._t2.move_to_end(key)
+        return item
+
+    def evict(self, key=None):
+        self._adapt(key)
+        if key not in self._b1 and key not in self._b2 and len(self._t1) >= self.capacity:
+            # T1 已占满全部主存：直接丢弃 T1 的 LRU 页面，不记入 B1
+            return self._t1.popitem(last=False)[1]
+        if self._t1 and (len(self._t1) > self.p or (key in self._b2 and len(self._t1) == self.p) or not self._t2):
+            victim_key, item = self._t1.popitem(last=False)
+            self._b1[victim_key] = None
+        else:
+            victim_key, item = self._t2.popitem(last=False)
+            self._b2[victim_key] = None
+        return item
+
+    def remove(self, key):
+        item = self._t1.pop(key, None)
+        if item is None:
+            item = self._t2.pop(key, None)
+        return item
+
+
+POLICIES = {
+    "lru": LRUPolicy,
+    "second_chance": SecondChancePolicy,
+    "clock": ClockPolicy,
+    "eclock": EnhancedClockPolicy,
+    "lfu": LFUPolicy,
+    "2q": TwoQueuePolicy,
+    "arc": ARCPolicy,
+}
+
+
+def make_policy(policy, capacity: int) -> ReplacementPolicy:
+    """根据策略名（见 POLICIES）或已创建的策略实例得到置换策略"""
+    if isinstance(policy, ReplacementPolicy):
+        return policy
+    try:
+        policy_class = POLICIES[policy.lower()]
+    except KeyError:
+        raise ValueError(f"未知的页面置换策略: {policy}，可选: {', '.join(POLICIES)}")
+    return policy_class(capacity)
@@ -0,0 +1,27 @@
+"""命名共享内存段"""
+
+
+class SharedSegment:
+    """可被多个进程映射的命名共享内存段
+
+    段像进程一样拥有自己的页表：段的页面在主存块表、置换策略和交换区中都以段为所有者，
+    每个段页面在主存中只有一份。映射该段的进程页表项指向段的主存块，修改位记在段的页表项上。
+    """
+
+    def __init__(self, name: str, page_count: int):
+        """
+        :param name: 段名
+        :param page_count: 段的页数
+        """
+        if page_count <= 0:
+            raise ValueError("共享段的页数必须大于 0")
+        self.name = name
+        self.pid = -1  # 由 PCBManager 分配的进程号
+        self.process_name = f"shm:{name}"  # 作为主存块所有者、交换区与倒排页表中的进程号
+        self.page_count = page_count
+        self.page_table = []  # 由 PCBManager 创建的稀疏页表
+        self.begin = -1
+        self.attached = {}  # 映射该段的进程 {pcb: 段在进程中的起始页号}
+
+    def __repr__(self):
+        return f"SharedSegment(name={self.name}, page_count={self.page_count}, attached={len(self.attached)})"
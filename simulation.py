@@ -0,0 +1,78 @@
+from buffer import log
+
+"""离散事件模拟"""
+
+
+class EventSimulator:
+    """离散事件模拟引擎：时钟直接跳到下一个事件
+
+    时钟即调度器的全局模拟时钟（每执行一条指令前进一步）。事件有三类：
+    到达——调度器到达队列中最早的 arrive_time；
+    I/O 完成——阻塞队列中最早的唤醒时刻；
+    时间片——就绪队列非空时立即调度一次，进程运行一个时间片，时钟前进实际执行的指令数，
+    其间的缺页在 request_page 中同步处理完毕，到达和唤醒在每条指令后处理。
+    就绪队列为空时不再逐个时钟调用 schedule()，而是把时钟直接拨到下一个到达或唤醒时刻，
+    运行时间与事件数成正比，而不是与模拟时间成正比。
+    """
+
+    def __init__(self, scheduler):
+        """
+        :param scheduler: Scheduler 实例（scheduler 或 Modification.scheduler_m）
+        """
+        self.scheduler = scheduler
+        self.stats = {"dispatches": 0, "skipped_ticks": 0}
+
+    @property
+    def now(self) -> int:
+        return self.scheduler.clock.now
+
+    def submit(self, process_name: str, arrive_time: int, need_time: int, task_name: str, size: int):
+        """创建一个在 arrive_time 时刻到达的进程"""
+        return self.scheduler.create_process(process_name, arrive_time, need_time, task_name, size,
+                                             memory_manager=self.scheduler.memory_manager)
+
+    def pending(self) -> int:
+        """尚未到达的进程数"""
+        return len(self.scheduler.pending_arrivals)
+
+    def next_event_time(self):
+        """下一个事件的时刻，没有任何事件时返回 None"""
+        if any(self.scheduler.feedback_queues):
+            return self.now
+        times = [t for t in (self.scheduler.block_queues.next_wake(), self.scheduler.next_arrival_time())
+                 if t is not None]
+        return max(self.now + 1, min(times)) if times else None
+
+    def step(self) -> bool:
+        """处理下一个事件时刻，没有事件时返回 False"""
+        event_time = self.next_event_time()
+        if event_time is None:
+            return False
+        if event_time > self.now + 1:
+            self.stats["skipped_ticks"] += event_time - 1 - self.now
+            self.scheduler.block_queues.advance(event_time - 1)
+        self.scheduler.schedule()
+        self.stats["dispatches"] += 1
+        return True
+
+    def run_until(self, time: int) -> int:
+        """处理时刻不晚于 time 的全部事件，之后时钟停在 time，返回当前时刻
+
+        time 时刻开始的时间片会运行完，时钟可能越过 time，最多一个时间片。
+        """
+        while True:
+            event_time = self.next_event_time()
+            if event_time is None or event_time > time:
+                break
+            self.step()
+        if time > self.now:
+            self.stats["skipped_ticks"] += time - self.now
+            self.scheduler.block_queues.advance(time)
+        return self.now
+
+    def run_until_idle(self) -> int:
+        """一直运行到没有就绪、阻塞和未到达的进程，返回当前时刻"""
+        while self.step():
+            pass
+        log.append(f"模拟结束，时刻 {self.now}，调度 {self.stats['dispatches']} 次，跳过空闲时钟 {self.stats['skipped_ticks']} 个")
+        return self.now
@@ -0,0 +1,120 @@
+import mmap
+import tempfile
+import time
+
+from buffer import PAGE_SIZE
+
+"""内存映射文件实现的交换区"""
+
+
+class SwapArea:
+    """交换区：映射到内存的文件，按页大小划分为槽
+
+    页面第一次换出时从空闲槽栈中分配一个槽，之后一直使用同一个槽，直到进程释放。
+    换入换出都通过 memoryview 切片在交换区与主存帧之间直接复制，不产生中间 bytes 对象。
+    槽用完时文件和映射扩大一倍。
+    也实现了 FileSwapStore 的 write_run/read_run/flush 接口，可作为 WriteBackQueue 的后端。
+    """
+
+    def __init__(self, slots: int = 1024, page_size: int = PAGE_SIZE, path: str = None):
+        """
+        :param slots: 初始槽数
+        :param page_size: 页面大小（字节）
+        :param path: 交换文件路径，为 None 时使用临时文件
+        """
+        if slots <= 0:
+            raise ValueError("交换区槽数必须大于 0")
+        self.page_size = page_size
+        self.slots = slots
+        self._file = open(path, "w+b") if path else tempfile.TemporaryFile()
+        self._file.truncate(slots * page_size)
+        self._map = mmap.mmap(self._file.fileno(), slots * page_size)
+        self._view = memoryview(self._map)
+        self._free = list(range(slots - 1, -1, -1))  # 空闲槽栈
+        self._slot_of = {}  # pid -> {页号: 槽号}
+        self.stats = {"page_ins": 0, "page_outs": 0, "zero_fills": 0,
+                      "bytes_in": 0, "bytes_out": 0, "time_in": 0.0, "time_out": 0.0}
+
+    def free_slots(self) -> int:
+        return len(self._free)
+
+    def _grow(self):
+        """槽用完时扩大交换文件并重新映射"""
+        old_slots = self.slots
+        self.slots *= 2
+        self._view.release()
+        self._map.close()
+        self._file.truncate(self.slots * self.page_size)
+        self._map = mmap.mmap(self._file.fileno(), self.slots * self.page_size)
+        self._view = memoryview(self._map)
+        self._free.extend(range(self.slots - 1, old_slots - 1, -1))
+
+    def _slot(self, pid, page_index: int, create: bool):
+        pages = self._slot_of.get(pid)
+        slot = pages.get(page_index) if pages else None
+        if slot is None and create:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self._slot_of.setdefault(pid, {})[page_index] = slot
+        return slot
+
+    def _slot_view(self, slot: int) -> memoryview:
+        offset = slot * self.page_size
+        return self._view[offset:offset + self.page_size]
+
+    def page_out(self, pid, page_index: int, src: memoryview):
+        """把主存帧 src 的内容写入页面的槽"""
+        start = time.perf_counter()
+        self._slot_view(self._slot(pid, page_index, create=True))[:] = src
+        self.stats["page_outs"] += 1
+        self.stats["bytes_out"] += self.page_size
+        self.stats["time_out"] += time.perf_counter() - start
+
+    def page_in(self, pid, page_index: int, dst: memoryview) -> bool:
+        """把页面内容读入主存帧 dst，页面从未换出过时清零并返回 False"""
+        start = time.perf_counter()
+        slot = self._slot(pid, page_index, create=False)
+        if slot is None:
+            dst[:] = bytes(self.page_size)
+            self.stats["zero_fills"] += 1
+            found = False
+        else:
+            dst[:] = self._slot_view(slot)
+            self.stats["page_ins"] += 1
+            self.stats["bytes_in"] += self.page_size
+            found = True
+        self.stats["time_in"] += time.perf_counter() - start
+        return found
+
+    def fork(self, parent_pid, child_pid):
+        """fork 时把父进程已换出的页面复制到子进程的槽中"""
+        for page_index, slot in list(self._slot_of.get(parent_pid, {}).items()):
+            child_slot = self._slot(child_pid, page_index, create=True)  # 可能扩大交换区，先于取视图
+            self._slot_view(child_slot)[:] = self._slot_view(slot)
+
+    def release(self, pid):
+        """进程销毁时回收其全部槽"""
+        self._free.extend(self._slot_of.pop(pid, {}).values())
+
+    def write_run(self, pid, first_page: int, page_count: int, pages):
+        """WriteBackQueue 后端接口：依次写入连续页面"""
+        for i, data in enumerate(pages):
+            self.page_out(pid, first_page + i, memoryview(data))
+
+    def read_run(self, pid, first_page: int, page_count: int, count: int) -> list:
+        """WriteBackQueue 后端接口：读出连续页面"""
+        pages = []
+        for i in range(count):
+            buffer = bytearray(self.page_size)
+            self.page_in(pid, first_page + i, memoryview(buffer))
+            pages.append(bytes(buffer))
+        return pages
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,83 @@
+import random
+from collections import OrderedDict
+
+"""快表（TLB）模拟"""
+
+
+class TLB:
+    """组相联快表，缓存 (pcb, page) -> 主存块号 的地址映射
+
+    页号对组数取模得到组号，每组最多 ways 项，组内按 LRU 或随机替换。
+    不带地址空间标签时进程切换会清空整个快表；带标签时各进程的表项共存，
+    只在页面被置换或进程释放时失效。
+    """
+
+    def __init__(self, sets: int = 16, ways: int = 4, replacement: str = "lru", tagged: bool = False):
+        """
+        :param sets: 组数
+        :param ways: 相联度（每组表项数）
+        :param replacement: 组内替换策略，"lru" 或 "random"
+        :param tagged: 表项是否带地址空间标签（ASID）
+        """
+        if sets <= 0 or ways <= 0:
+            raise ValueError("快表的组数和相联度必须大于 0")
+        if replacement not in ("lru", "random"):
+            raise ValueError(f"未知的快表替换策略: {replacement}")
+        self.sets = sets
+        self.ways = ways
+        self.replacement = replacement
+        self.tagged = tagged
+        self._sets = [OrderedDict() for _ in range(sets)]  # 每组 (pcb, page) -> 块号
+        self._current = None  # 当前运行的进程
+        self.stats = {"hits": 0, "misses": 0, "flushes": 0, "evictions": 0}
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._sets)
+
+    def _set_of(self, page_index):
+        return self._sets[page_index % self.sets]
+
+    def lookup(self, pcb, page_index):
+        """查快表，命中返回块号，未命中返回 None"""
+        entries = self._set_of(page_index)
+        frame = entries.get((pcb, page_index))
+        if frame is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        if self.replacement == "lru":
+            entries.move_to_end((pcb, page_index))
+        return frame
+
+    def insert(self, pcb, page_index, frame):
+        """填入地址映射，组满时替换一项"""
+        entries = self._set_of(page_index)
+        key = (pcb, page_index)
+        if key not in entries and len(entries) >= self.ways:
+            if self.replacement == "lru":
+                entries.popitem(last=False)
+            else:
+                del entries[random.choice(list(entries))]
+            self.stats["evictions"] += 1
+        entries[key] = frame
+
+    def invalidate(self, pcb, page_index):
+        """页面被置换或释放时使对应表项失效"""
+        self._set_of(page_index).pop((pcb, page_index), None)
+
+    def flush(self):
+        for entries in self._sets:
+            entries.clear()
+        self.stats["flushes"] += 1
+
+    def context_switch(self, pcb):
+        """进程切换：不带标签时清空快表"""
+        if pcb is self._current:
+            return
+        self._current = pcb
+        if not self.tagged:
+            self.flush()
+
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
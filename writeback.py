@@ -0,0 +1,197 @@
+import bisect
+import os
+import tempfile
+import time
+
+from buffer import PAGE_SIZE
+
+"""脏页写回：写回队列与文件模拟的外存交换区"""
+
+
+class FileSwapStore:
+    """以本地文件模拟的外存交换区
+
+    每个进程第一次写回时分配一段连续区域（按进程页数），页号相邻的页面在文件中也相邻，
+    连续的一批页面只需一次 seek + write。进程销毁时 release 归还区域，空闲区域按首次适配复用，
+    相邻的空闲区域合并，文件末尾的空闲区域直接收回。文件是稀疏的，未写过的部分不占磁盘空间。
+    复用的区域可能还留有旧进程的内容，读出时本进程未写过的页面一律为全零。
+    """
+
+    def __init__(self, path: str = None, page_size: int = PAGE_SIZE, sync: bool = False):
+        """
+        :param path: 交换文件路径，为 None 时使用临时文件
+        :param page_size: 页面大小（字节）
+        :param sync: 每次刷写后是否 fsync
+        """
+        self.page_size = page_size
+        self.sync = sync
+        self._file = open(path, "w+b") if path else tempfile.TemporaryFile()
+        self._regions = {}  # pid -> (区域起始槽号, 区域页数)
+        self._written = {}  # pid -> 已写入的页号集合
+        self._free_extents = []  # 空闲区域 [(起始槽号, 页数), ...]，按起始槽号排序
+        self._next_slot = 0
+        self.stats = {"writes": 0, "reads": 0, "bytes_written": 0, "bytes_read": 0}
+
+    def _allocate_region(self, page_count: int) -> int:
+        """首次适配分配 page_count 个连续槽，返回起始槽号"""
+        for i, (base, size) in enumerate(self._free_extents):
+            if size >= page_count:
+                if size == page_count:
+                    del self._free_extents[i]
+                else:
+                    self._free_extents[i] = (base + page_count, size - page_count)
+                return base
+        base = self._next_slot
+        self._next_slot += page_count
+        return base
+
+    def _offset(self, pid, page_index: int, page_count: int, count: int = 1) -> int:
+        region = self._regions.get(pid)
+        if region is None:
+            region = self._regions[pid] = (self._allocate_region(page_count), page_count)
+        base, size = region
+        if page_index < 0 or page_index + count > size:
+            raise ValueError(f"页面 {page_index}~{page_index + count - 1} 超出进程 {pid} 的交换区域（{size} 页）")
+        return (base + page_index) * self.page_size
+
+    def release(self, pid):
+        """进程销毁时归还其区域"""
+        region = self._regions.pop(pid, None)
+        self._written.pop(pid, None)
+        if region is None:
+            return
+        base, size = region
+        extents = self._free_extents
+        i = bisect.bisect(extents, region)
+        # 与前后相邻的空闲区域合并
+        if i < len(extents) and base + size == extents[i][0]:
+            size += extents.pop(i)[1]
+        if i > 0 and extents[i - 1][0] + extents[i - 1][1] == base:
+            i -= 1
+            base, size = extents[i][0], extents[i][1] + size
+            del extents[i]
+        if base + size == self._next_slot:
+            self._next_slot = base
+            self._file.truncate(base * self.page_size)
+        else:
+            extents.insert(i, (base, size))
+
+    def write_run(self, pid, first_page: int, page_count: int, pages):
+        """把页号从 first_page 开始的连续页面一次写入"""
+        data = b"".join(pages)
+        self._file.seek(self._offset(pid, first_page, page_count, len(pages)))
+        self._file.write(data)
+        self._written.setdefault(pid, set()).update(range(first_page, first_page + len(pages)))
+        self.stats["writes"] += 1
+        self.stats["bytes_written"] += len(data)
+
+    def read_run(self, pid, first_page: int, page_count: int, count: int) -> list:
+        """读出页号从 first_page 开始的 count 个页面，本进程从未写过的页面为全零"""
+        self._file.seek(self._offset(pid, first_page, page_count, count))
+        data = self._file.read(count * self.page_size).ljust(count * self.page_size, b"\0")
+        self.stats["reads"] += 1
+        self.stats["bytes_read"] += len(data)
+        written = self._written.get(pid, ())
+        zero_page = bytes(self.page_size)
+        return [data[i * self.page_size:(i + 1) * self.page_size] if first_page + i in written else zero_page
+                for i in range(count)]
+
+    def flush(self):
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class WriteBackQueue:
+    """脏页写回队列
+
+    被置换的脏页先进入队列，队列达到 flush_threshold 页时按 (进程, 页号) 排序，
+    把页号连续的页面合并成一次写入。flush_threshold 为 1 即立即写回（eager），
+    较大时为延迟写回（lazy）：写回前再次变脏的同一页面只写一次，被重新调入的页面不再写回。
+    max_gap 大于 0 时，间隔不超过 max_gap 页的两段也合并写入，中间的页面从交换区读出后原样写回，
+    以多写的字节换更少的 I/O 次数。
+    """
+
+    def __init__(self, store: FileSwapStore, flush_threshold: int = 8, max_gap: int = 0):
+        self.store = store
+        self.flush_threshold = flush_threshold
+        self.max_gap = max_gap
+        self._pending = {}  # (进程名, 页号) -> (进程页数, 页面内容)
+        self.flush_latencies = []  # 每次刷写耗时（秒）
+        self.stats = {"dirty_pages": 0, "absorbed": 0, "cancelled": 0,
+                      "pages_written": 0, "bytes_written": 0, "batches": 0, "flushes": 0}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def enqueue(self, pcb, page_index: int, data: bytes = None):
+        """脏页被置换时加入队列"""
+        key = (pcb.process_name, page_index)
+        if key in self._pending:
+            self.stats["absorbed"] += 1
+        self._pending[key] = (pcb.page_count, data if data is not None else bytes(self.store.page_size))
+        self.stats["dirty_pages"] += 1
+        if len(self._pending) >= self.flush_threshold:
+            self.flush()
+
+    def cancel(self, pcb, page_index: int):
+        """页面在写回前被重新调入：从队列中取出其内容，返回 None 表示不在队列中"""
+        entry = self._pending.pop((pcb.process_name, page_index), None)
+        if entry is None:
+            return None
+        self.stats["cancelled"] += 1
+        return entry[1]
+
+    def discard_process(self, pcb):
+        """进程销毁后其脏页无需写回，并归还其交换区域"""
+        for key in [key for key in self._pending if key[0] == pcb.process_name]:
+            del self._pending[key]
+        self.store.release(pcb.process_name)
+
+    def flush(self):
+        """合并相邻页面，批量写入交换区"""
+        if not self._pending:
+            return
+        start = time.perf_counter()
+        keys = sorted(self._pending)
+        i = 0
+        while i < len(keys):
+            pid, first_page = keys[i]
+            page_count = self._pending[keys[i]][0]
+            pages = [self._pending[keys[i]][1]]
+            last_page = first_page
+            j = i + 1
+            while j < len(keys) and keys[j][0] == pid and keys[j][1] - last_page - 1 <= self.max_gap:
+                gap = keys[j][1] - last_page - 1
+                if gap:
+                    pages.extend(self.store.read_run(pid, last_page + 1, page_count, gap))
+                pages.append(self._pending[keys[j]][1])
+                last_page = keys[j][1]
+                j += 1
+            self.store.write_run(pid, first_page, page_count, pages)
+            self.stats["batches"] += 1
+            self.stats["pages_written"] += len(pages)
+            self.stats["bytes_written"] += len(pages) * self.store.page_size
+            i = j
+        self.store.flush()
+        self._pending.clear()
+        self.stats["flushes"] += 1
+        self.flush_latencies.append(time.perf_counter() - start)
+
+    def write_amplification(self) -> float:
+        """实际写入字节数 / 被置换的脏页字节数"""
+        dirty_bytes = self.stats["dirty_pages"] * self.store.page_size
+        return self.stats["bytes_written"] / dirty_bytes if dirty_bytes else 0.0
+
+    def latency_stats(self) -> dict:
+        """刷写耗时统计（秒）"""
+        if not self.flush_latencies:
+            return {"flushes": 0, "mean": 0.0, "max": 0.0}
+        return {
+            "flushes": len(self.flush_latencies),
+            "mean": sum(self.flush_latencies) / len(self.flush_latencies),
+            "max": max(self.flush_latencies),
+        }